@@ -1,155 +1,72 @@
-import io
-import re
+import logging
+import os
 import time
-import unicodedata
-import requests
-import pandas as pd
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+import fixtures
+import names
+import pipeline
+import tracing
+from refresher import Refresher
 
 # ---------------- Config ----------------
 DEFAULT_LEAGUE_ID = st.secrets.get("LEAGUE_ID", "cmdnhqw1s06g2kv0431dxfade")
 DEFAULT_TEAM_ID   = st.secrets.get("TEAM_ID",   "cmdofouqx0009jt04qjgcm5cn")
 DEFAULT_TEAM_NAME = st.secrets.get("TEAM_NAME", "")  # optional fallback
 
-CSV_URL   = "https://app.draftfantasy.com/api/players/csv"
-LIVE_URL  = "https://app.draftfantasy.com/api/league/{league_id}/transfers-data"
-
-# FPL (free, no auth)
-FPL_BOOTSTRAP = "https://fantasy.premierleague.com/api/bootstrap-static/"
-FPL_FIXTURES  = "https://fantasy.premierleague.com/api/fixtures/?future=1"
-
-# --------------- Helpers ----------------
-def normalize_name(s: str) -> str:
-    s = unicodedata.normalize("NFKD", str(s)).encode("ascii", "ignore").decode("ascii").lower()
-    s = re.sub(r"[^a-z]+", " ", s)
-    return re.sub(r"\s+", " ", s).strip()
-
-def minmax(s: pd.Series) -> pd.Series:
-    s = pd.to_numeric(s, errors="coerce").fillna(0)
-    if s.max() == s.min():
-        return pd.Series(0.0, index=s.index)
-    return (s - s.min()) / (s.max() - s.min())
-
-def extract_player_name(p):
-    return (
-        p.get("name")
-        or (p.get("player") or {}).get("name")
-        or p.get("playerName")
-        or (p.get("data") or {}).get("name")
-        or (p.get("ws") or {}).get("name")
-        or (p.get("info") or {}).get("name")
-    )
-
-def fetch_live_league(league_id: str):
-    url = LIVE_URL.format(league_id=league_id)
-    r = requests.get(url, timeout=20)
-    r.raise_for_status()
-    data = r.json()
-    league = data.get("league", data)
-    teams = league.get("teams", [])
-    owner_by_name = {}
-    players_by_team = {}
-    teams_index = []
-    total_names = 0
-    for t in teams:
-        tname = t.get("name") or t.get("teamName") or "-"
-        tid = str(t.get("id") or t.get("teamId") or "").strip()
-        roster = (
-            t.get("teamPlayers")
-            or t.get("players")
-            or t.get("squad")
-            or t.get("roster")
-            or []
-        )
-        teams_index.append((tid, tname))
-        players_by_team[tid] = []
-        for p in roster:
-            pname = extract_player_name(p)
-            if pname:
-                total_names += 1
-                owner_by_name[normalize_name(pname)] = tname
-                players_by_team[tid].append(pname)
-    return owner_by_name, players_by_team, teams_index, total_names
-
-def get_fpl_data():
-    bs = requests.get(FPL_BOOTSTRAP, timeout=20).json()
-    fixtures = requests.get(FPL_FIXTURES,  timeout=20).json()
-    fpl_players = pd.DataFrame(bs["elements"])[[
-        "id","first_name","second_name","web_name","team","status",
-        "chance_of_playing_next_round","news","ict_index","form"
-    ]].copy()
-    fpl_teams = pd.DataFrame(bs["teams"])[["id","name","short_name"]].copy()
-    return fpl_players, fpl_teams, fixtures
-
-# Club label mapping (DraftFantasy CSV -> FPL short names)
-CLUB_TO_SHORT = {
-    "Arsenal":"ARS","Aston Villa":"AVL","Bournemouth":"BOU","Brentford":"BRE","Brighton":"BHA",
-    "Chelsea":"CHE","Crystal Palace":"CRY","Everton":"EVE","Fulham":"FUL","Ipswich":"IPS",
-    "Leicester":"LEI","Liverpool":"LIV","Man City":"MCI","Man Utd":"MUN","Newcastle":"NEW",
-    "Nott'm Forest":"NFO","Nottingham Forest":"NFO","Southampton":"SOU","Spurs":"TOT","West Ham":"WHU","Wolves":"WOL",
+# Cache TTLs per source (seconds). st.cache_data is process-wide, so all sessions share them.
+TTL_LEAGUE    = 60          # ownership moves with every waiver/trade
+TTL_PLAYERS   = 15 * 60     # DraftFantasy stats CSV
+TTL_BOOTSTRAP = 5 * 60      # FPL availability/ICT/form; cheap 304 revalidation
+TTL_FIXTURES  = 6 * 60 * 60 # FDR only changes when fixtures are rescheduled
+REFRESH_INTERVAL = TTL_LEAGUE  # background rebuild of the merged pool
+
+# WAIVER_TRACE_LOG=1 prints every span as a JSON line on stderr (Streamlit leaves other loggers at WARNING).
+if os.environ.get("WAIVER_TRACE_LOG") and not tracing.log.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    tracing.log.addHandler(_handler)
+    tracing.log.setLevel(logging.INFO)
+
+# --------------- Cached data layer ----------------
+CACHED_FETCHERS = {
+    "league":    st.cache_data(ttl=TTL_LEAGUE,    show_spinner=False)(pipeline.fetch_live_league),
+    "players":   st.cache_data(ttl=TTL_PLAYERS,   show_spinner=False)(pipeline.fetch_players_csv),
+    "bootstrap": st.cache_data(ttl=TTL_BOOTSTRAP, show_spinner=False)(pipeline.fetch_fpl_bootstrap),
+    "fixtures":  st.cache_data(ttl=TTL_FIXTURES,  show_spinner=False)(pipeline.fetch_fpl_fixtures),
 }
 
-def club_next_fdr_lookup(fpl_teams: pd.DataFrame, fixtures: list):
-    future = pd.DataFrame(fixtures)
-    next_events = sorted(set(future["event"].dropna().unique()))
-    next_gw = next_events[0] if next_events else None
-    team_fdr = {}
-    if next_gw is not None:
-        fgw = future[future["event"] == next_gw]
-        for _, row in fgw.iterrows():
-            team_fdr[row["team_h"]] = row["team_h_difficulty"]
-            team_fdr[row["team_a"]] = row["team_a_difficulty"]
-    short_to_id = dict(zip(fpl_teams["short_name"], fpl_teams["id"]))
-    def club_next_fdr(club: str) -> float | None:
-        short = CLUB_TO_SHORT.get(club)
-        if not short: 
+def build_pool(league_id: str):
+    """Fetch every source and merge them into the shared, read-only player pool."""
+    ctx = get_script_run_ctx(suppress_warning=True)  # None on the background refresher
+    with tracing.collect() as trace:
+        fetched = pipeline.fetch_all(league_id, CACHED_FETCHERS,
+                                     initializer=lambda: add_script_run_ctx(ctx=ctx))
+        pool = pipeline.build_pool(fetched)
+    return pool._replace(trace=tuple(trace.spans))
+
+def seed_pool(league_id: str):
+    """Pool rebuilt from the last on-disk snapshots, so a restart renders without the network."""
+    with tracing.collect() as trace:
+        with tracing.span("load_snapshot"):
+            snap = pipeline.load_snapshot(league_id)
+        if snap is None:
             return None
-        tid = short_to_id.get(short)
-        return team_fdr.get(tid)  # 1 easy .. 5 hard
-    return club_next_fdr
-
-def build_my_squad_text_from_names(names: list, df_pool: pd.DataFrame) -> str:
-    if not names:
-        return ""
-    df_my = df_pool[df_pool["Name"].isin(set(names))].copy()
-    lines = {
-        "GK": ", ".join(df_my[df_my["Position"]=="GK"]["Name"].tolist()),
-        "DEF": ", ".join(df_my[df_my["Position"]=="DEF"]["Name"].tolist()),
-        "MID": ", ".join(df_my[df_my["Position"]=="MID"]["Name"].tolist()),
-        "FWD": ", ".join(df_my[df_my["Position"]=="FWD"]["Name"].tolist()),
-    }
-    return "\n".join([
-        f"GK: {lines['GK']}",
-        f"DEF: {lines['DEF']}",
-        f"MID: {lines['MID']}",
-        f"FWD: {lines['FWD']}",
-    ])
-
-def build_prompt(df_top: pd.DataFrame, my_squad_text: str) -> str:
-    def rowline(r):
-        news_short = (str(r.get("news") or "").split(".")[0])[:120]
-        avail = r.get("chance_of_playing_next_round")
-        avail_txt = f"{int(avail)}%" if pd.notna(avail) else "—"
-        ease = r.get("FixtureEase")
-        ease_txt = f"{ease:.1f}" if pd.notna(ease) else "—"
-        return (
-            f"{r['Name']} ({r['Position']}, {r['Club']}) – "
-            f"PPG:{r.get('Point per game',0)}, ICT:{r.get('ict_index','—')}, "
-            f"Ease:{ease_txt}, Avail:{avail_txt}, Note:{news_short} 🟢 Free"
-        )
-    avail_text = "\n".join(rowline(r) for _, r in df_top.iterrows())
-    return f"""🟩 My Squad:
-{my_squad_text}
+        pool = pipeline.build_pool(snap[0])
+    return pool._replace(trace=tuple(trace.spans)), snap[1]
 
-🟢 Top 25 (composite score):
-{avail_text}
+@st.cache_resource(show_spinner=False)
+def get_refresher(league_id: str) -> Refresher:
+    # One warm pool per league, shared by every session and rebuilt in the background.
+    return Refresher(lambda: build_pool(league_id), interval=REFRESH_INTERVAL, name=f"pool-{league_id}",
+                     seed=lambda: seed_pool(league_id))
 
-🎯 Rules:
-- Only suggest players not already owned
-- Blend PPG, ICT, and fixture ease; prefer high minutes and good availability
-- Suggest 1–2 picks and who they could replace
-
-Who should I bring in this week and why?"""
+@st.cache_resource(show_spinner=False, max_entries=32)
+def get_features(_pool: pipeline.Pool, league_id: str, built_at: float, min_avail: str, horizon: int):
+    # Keyed on the snapshot, not its contents (the leading underscore skips hashing the pool),
+    # so a weight change reruns only pipeline.score() on these shared, read-only features.
+    return pipeline.features(_pool.df, _pool.fixtures, min_avail, horizon)
 
 # ---------------- UI ----------------
 st.set_page_config(page_title="Draft Waiver Assistant", page_icon="⚽", layout="centered")
@@ -160,105 +77,87 @@ with st.expander("Settings", expanded=False):
     league_id = st.text_input("League ID", value=DEFAULT_LEAGUE_ID)
     team_id   = st.text_input("Team ID",   value=DEFAULT_TEAM_ID)
     team_name_hint = st.text_input("Team name (optional fallback)", value=DEFAULT_TEAM_NAME)
+    force_refresh = st.button("Force refresh data")
+    if force_refresh:
+        for fetcher in CACHED_FETCHERS.values():
+            fetcher.clear()
 
 with st.expander("Ranking weights", expanded=False):
-    w_ppg  = st.slider("Weight: Points per game", 0.0, 2.0, 1.0, 0.05)
-    w_ict  = st.slider("Weight: ICT Index",       0.0, 2.0, 0.6, 0.05)
-    w_fix  = st.slider("Weight: Fixture ease",    0.0, 2.0, 0.8, 0.05)
-    w_form = st.slider("Weight: Form (last 5)",   0.0, 2.0, 0.6, 0.05)
+    weights = pipeline.Weights(
+        ppg  = st.slider("Weight: Points per game", 0.0, 2.0, 1.0, 0.05),
+        ict  = st.slider("Weight: ICT Index",       0.0, 2.0, 0.6, 0.05),
+        fix  = st.slider("Weight: Fixture ease",    0.0, 2.0, 0.8, 0.05),
+        form = st.slider("Weight: Form (last 5)",   0.0, 2.0, 0.6, 0.05),
+        run  = st.slider("Weight: Fixture run",     0.0, 2.0, 0.6, 0.05),
+    )
+    horizon = st.slider("Fixture run horizon (gameweeks)", 1, fixtures.MAX_HORIZON, fixtures.HORIZON)
     min_avail = st.selectbox("Availability filter", ["All","75%+ only"], index=1)
 
-# Live league
-owner_by_name, players_by_team, teams_index, total_names = fetch_live_league(league_id)
-
-# CSV stats
-r = requests.get(CSV_URL, timeout=20); r.encoding = "utf-8"
-df_pool = pd.read_csv(io.StringIO(r.text))
-df_pool["Name_norm"] = df_pool["Name"].apply(normalize_name)
-df_pool = df_pool.rename(columns={
-    "PointsPerGame": "Point per game",
-    "Goals Conceded": "Goals conceded",
-    "Yellow Cards": "Yellow cards",
-    "Red Cards": "Red cards",
-    "Clean Sheets": "Clean sheets",
-})
-
-# FPL data
-fpl_players, fpl_teams, fpl_fixtures = get_fpl_data()
-club_next_fdr = club_next_fdr_lookup(fpl_teams, fpl_fixtures)
-
-# Fixture ease
-df_pool["FDR_next"] = df_pool["Club"].apply(club_next_fdr)
-df_pool["FixtureEase"] = df_pool["FDR_next"].apply(lambda d: None if pd.isna(d) else 6 - d)
-
-# Merge FPL player info
-def norm(s): 
-    return re.sub(r"\s+"," ",unicodedata.normalize("NFKD", str(s)).encode("ascii","ignore").decode("ascii").lower()).strip()
-fpl_players["name_key"] = fpl_players["web_name"].map(norm)
-df_pool["name_key"]     = df_pool["Name"].map(norm)
-fpl_sub = fpl_players[["name_key","status","chance_of_playing_next_round","news","ict_index","form"]].copy()
-df_pool = df_pool.merge(fpl_sub, on="name_key", how="left")
-
-# Availability signals
-df_pool["Available_nextGW"] = (
-    (df_pool["status"].isin(["a","d"])) &
-    (df_pool["chance_of_playing_next_round"].fillna(100) >= 75)
-)
-df_pool["Returning_flag"] = df_pool["news"].fillna("").str.contains("available|returned|back|fit", case=False, regex=True)
-
-# Ownership (LIVE) by name
-df_pool["Owner"] = df_pool["Name_norm"].map(owner_by_name).fillna("-")
+# Serve the last good pool immediately; only a cold start or force refresh waits on the network.
+refresher = get_refresher(league_id)
+with st.spinner("Fetching DraftFantasy + FPL data…"):
+    pool = refresher.refresh() if force_refresh else refresher.get()
+df_pool, match = pool.df, pool.match
+if refresher.last_error is not None:
+    st.warning(f"Background refresh failed, showing data from {time.strftime('%H:%M:%S', time.localtime(refresher.loaded_at))}: {refresher.last_error}")
 
 # Show team ids
 st.caption("Available team IDs in this league:")
-for tid, tname in teams_index:
+for tid, tname in pool.teams_index:
     st.caption(f"• {tname} → {tid}")
-st.caption(f"Detected rostered player names: {total_names}")
+st.caption(f"Detected rostered player names: {pool.total_names}")
+st.caption(f"Matched to FPL: {match.fpl_id.notna().sum()}/{len(df_pool)} players")
+if len(match.unmatched_pool):
+    with st.expander(f"Unmatched players ({len(match.unmatched_pool)} DraftFantasy, {len(match.unmatched_fpl)} FPL)"):
+        st.dataframe(match.unmatched_pool, use_container_width=True)
+        st.dataframe(match.unmatched_fpl, use_container_width=True)
 
 # My squad
-tid = str(team_id).strip()
-my_names = players_by_team.get(tid)
-if (not my_names) and team_name_hint:
-    for t_tid, t_name in teams_index:
-        if t_name.strip().lower() == team_name_hint.strip().lower():
-            my_names = players_by_team.get(t_tid)
-            break
-my_squad_text = build_my_squad_text_from_names(my_names or [], df_pool)
+my_names = pipeline.find_my_squad(pool.players_by_team, pool.teams_index, team_id, team_name_hint)
+my_squad_text = pipeline.build_my_squad_text_from_names(my_names, df_pool)
 
 st.subheader("Your Squad")
 st.text(my_squad_text if my_squad_text.strip() else "No players found for this Team ID. Double‑check Settings or use the team name fallback.")
 
-# Filter to truly free
-df_avail = df_pool[df_pool["Owner"] == "-"].copy()
-if min_avail == "75%+ only":
-    df_avail = df_avail[(df_avail["Available_nextGW"]) | (df_avail["chance_of_playing_next_round"].isna())]
-
-# Composite score
-df_avail["_ppg_n"]  = minmax(df_avail["Point per game"])
-df_avail["_ict_n"]  = minmax(df_avail["ict_index"])
-df_avail["_fix_n"]  = minmax(df_avail["FixtureEase"].fillna(0))
-df_avail["_form_n"] = minmax(df_avail["form"])
-df_avail["Score"] = (
-    w_ppg*df_avail["_ppg_n"] + 
-    w_ict*df_avail["_ict_n"] + 
-    w_fix*df_avail["_fix_n"] + 
-    w_form*df_avail["_form_n"]
-    + 0.05*df_avail["Returning_flag"].fillna(False).astype(int)
-)
-
-rank_cols = ["Name","Club","Position","Point per game","Goals","Assists","Clean sheets",
-             "FixtureEase","ict_index","chance_of_playing_next_round","news","Score"]
-
-df_top = df_avail.sort_values("Score", ascending=False).head(25)
+# Rank the free players (features only show up in the trace when get_features missed)
+with tracing.collect() as rerun_trace:
+    df_feat = get_features(pool, league_id, pool.built_at, min_avail, horizon)
+    df_scored = pipeline.score(df_feat, weights)
+    df_top = pipeline.top_k(df_scored)
+    df_by_pos = pipeline.top_k_by_position(df_scored)
+    prompt = pipeline.build_prompt(df_top, my_squad_text, df_by_pos)
 
-# Prompt + table
-prompt = build_prompt(df_top, my_squad_text)
+# Prompt + tables
 st.subheader("Copy‑and‑paste Prompt")
 st.code(prompt)
 
 st.subheader("Top 25 (composite score)")
-st.dataframe(df_top[rank_cols], use_container_width=True)
+tabs = st.tabs(["Overall"] + pipeline.POSITIONS)
+with tabs[0]:
+    st.dataframe(df_top[pipeline.RANK_COLS], use_container_width=True)
+by_pos = dict(tuple(df_by_pos.groupby("Position", sort=False, observed=True)))
+for tab, pos in zip(tabs[1:], pipeline.POSITIONS):
+    with tab:
+        if pos in by_pos:
+            st.dataframe(by_pos[pos][pipeline.RANK_COLS], use_container_width=True)
+        else:
+            st.caption(f"No free {pos} players match the filters.")
 
 st.download_button("Download prompt (.txt)", data=prompt, file_name="waiver_prompt.txt", mime="text/plain")
 
-st.caption("⏱️ Last updated: " + time.strftime("%Y-%m-%d %H:%M:%S"))
+st.caption("⏱️ Last updated: " + time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(refresher.loaded_at)))
+
+def span_rows(records):
+    return [{"stage": "\u2003" * r["depth"] + r["span"], "ms": r["ms"],
+             **{k: v for k, v in r.items() if k not in ("span", "id", "parent", "started_at", "ms", "depth")}}
+            for r in records]
+
+with st.expander("Diagnostics", expanded=False):
+    st.caption("Sources for the current pool (cache hit = served by st.cache_data, revalidated = HTTP 304, "
+               "wire_bytes = response bytes before gunzip):")
+    st.dataframe(pipeline.fetch_diagnostics(pool.trace), use_container_width=True)
+    st.caption(f"Pool build at {time.strftime('%H:%M:%S', time.localtime(pool.built_at))}:")
+    st.dataframe(span_rows(tracing.records(pool.trace)), use_container_width=True)
+    st.caption("This rerun:")
+    st.dataframe(span_rows(rerun_trace.records()), use_container_width=True)
+    st.caption(f"Name memo: {names.memo.hits:,} hits / {names.memo.misses:,} misses since start")
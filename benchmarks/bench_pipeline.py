@@ -0,0 +1,169 @@
+"""End-to-end benchmark of the ranking pipeline, stage by stage.
+
+Times parse -> normalize -> FDR lookup -> FPL merge -> availability flags ->
+ownership -> features -> scoring -> top-k -> build_prompt on synthetic pools
+and, with --recording, on a replay.py recording; no network is used. The
+first run of each dataset starts with an empty name memo and crosswalk (cold);
+the median of the rest is the steady state the app sees. Results are written
+as JSON, and --compare flags stages that got slower than a previous file.
+
+    python benchmarks/bench_pipeline.py [--sizes 1000 10000 100000] [--recording DIR]
+                                        [--repeat 5] [--out FILE] [--compare BASELINE.json]
+"""
+import argparse
+import io
+import json
+import platform
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+from urllib.parse import unquote
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks import synth
+import names
+import pipeline
+import replay
+from crosswalk import Crosswalk
+from fixtures import FIXTURE_COLS, build_fixture_matrix
+from names import NameMemo
+
+RESULTS_DIR = Path(__file__).parent / "results"
+REGRESSION = 1.25   # median slower than baseline by this factor...
+NOISE_MS = 1.0      # ...and by more than this is flagged
+
+
+def league_id_of(bodies: dict[str, bytes]) -> str:
+    for name in bodies:
+        m = re.search(r"/api/league/([^/]+)/transfers-data", unquote(name))
+        if m:
+            return m.group(1)
+    raise SystemExit("recording has no transfers-data response")
+
+
+def run_once(bodies: dict[str, bytes], league_id: str) -> dict[str, float]:
+    """One pass over every stage; seconds per stage."""
+    timings = {}
+
+    def stage(name, fn, *args):
+        start = time.perf_counter()
+        out = fn(*args)
+        timings[name] = time.perf_counter() - start
+        return out
+
+    def body(url):
+        return bodies[replay.recording_name(url)]
+
+    df = stage("parse_csv", pipeline.read_players_csv, io.BytesIO(body(pipeline.CSV_URL)))
+    owner_by_name, players_by_team, teams_index, _ = stage(
+        "parse_league", lambda b: pipeline.league_from_roster(pipeline.league_roster(json.loads(b))),
+        body(pipeline.LIVE_URL.format(league_id=league_id)))
+    fpl_players, fpl_teams = stage("parse_bootstrap", pipeline.parse_bootstrap, body(pipeline.FPL_BOOTSTRAP))
+    fixtures = stage("parse_fixtures", lambda b: build_fixture_matrix(pd.DataFrame(json.loads(b), columns=FIXTURE_COLS)),
+                     body(pipeline.FPL_FIXTURES))
+
+    df = stage("normalize", pipeline.normalize_players, df)
+    df = stage("fdr", pipeline.with_fixtures, df, fpl_teams, fixtures)
+    df, _ = stage("merge", pipeline.with_fpl, df, fpl_players)
+    df = stage("availability", pipeline.with_availability, df)
+    df = stage("ownership", pipeline.with_owner, df, owner_by_name)
+
+    feat = stage("features", pipeline.features, df, fixtures)
+    df_scored = stage("score", pipeline.score, feat)
+    df_top = stage("top_k", pipeline.top_k, df_scored)
+    df_by_pos = stage("top_k_by_position", pipeline.top_k_by_position, df_scored)
+    my_names = players_by_team.get(teams_index[0][0], []) if teams_index else []
+    squad = pipeline.build_my_squad_text_from_names(my_names, df)
+    stage("build_prompt", pipeline.build_prompt, df_top, squad, df_by_pos)
+    return timings
+
+
+def bench(bodies: dict[str, bytes], repeat: int) -> dict:
+    # Fresh, in-memory memo and crosswalk: the first run is cold and nothing touches .cache/.
+    names.memo = NameMemo(names.MEMO_MAXSIZE, path=None)
+    pipeline.crosswalk = Crosswalk(None)
+    league_id = league_id_of(bodies)
+    runs = [run_once(bodies, league_id) for _ in range(repeat)]
+    rows = len(pipeline.read_players_csv(io.BytesIO(bodies[replay.recording_name(pipeline.CSV_URL)])))
+    stages = {
+        name: {
+            "cold_ms": runs[0][name] * 1e3,
+            "median_ms": statistics.median(r[name] for r in runs[1:] or runs) * 1e3,
+            "min_ms": min(r[name] for r in runs) * 1e3,
+        }
+        for name in runs[0]
+    }
+    stages["total"] = {k: sum(s[k] for s in stages.values()) for k in ("cold_ms", "median_ms", "min_ms")}
+    return {"rows": rows, "repeat": repeat, "stages": stages}
+
+
+def report(label: str, result: dict) -> None:
+    print(f"\n{label} ({result['rows']:,} players)")
+    print(f"  {'stage':<18}{'cold ms':>10}{'median ms':>11}{'min ms':>10}")
+    for name, s in result["stages"].items():
+        print(f"  {name:<18}{s['cold_ms']:>10.2f}{s['median_ms']:>11.2f}{s['min_ms']:>10.2f}")
+
+
+def compare(results: dict, baseline: dict) -> int:
+    """Print median ratios against a baseline file; returns the number of regressions."""
+    regressions = 0
+    print(f"\nvs {baseline['created']} (x = new/old median)")
+    for label, result in results["datasets"].items():
+        old = baseline["datasets"].get(label)
+        if old is None:
+            continue
+        for name, s in result["stages"].items():
+            if name not in old["stages"]:
+                continue
+            new_ms, old_ms = s["median_ms"], old["stages"][name]["median_ms"]
+            ratio = new_ms / old_ms if old_ms else float("inf")
+            slower = ratio > REGRESSION and new_ms - old_ms > NOISE_MS
+            regressions += slower
+            print(f"  {label:<18}{name:<18}{old_ms:>10.2f} -> {new_ms:>9.2f} ms  x{ratio:5.2f}{'  REGRESSION' if slower else ''}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="*", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--recording", type=Path, help="replay.py recording directory")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", type=Path, help=f"results file (default: {RESULTS_DIR.name}/<timestamp>.json)")
+    parser.add_argument("--compare", type=Path, help="earlier results file; exit 1 on a regression")
+    args = parser.parse_args(argv)
+
+    datasets = {}
+    if args.recording:
+        datasets["recorded"] = lambda: {p.name: p.read_bytes() for p in args.recording.iterdir() if p.is_file()}
+    for n in args.sizes:
+        datasets[f"synthetic-{n}"] = lambda n=n: synth.recording(n, "bench")
+
+    results = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "csv_engine": pipeline.CSV_ENGINE,
+        "datasets": {},
+    }
+    for label, load in datasets.items():
+        results["datasets"][label] = bench(load(), args.repeat)
+        report(label, results["datasets"][label])
+
+    out = args.out or RESULTS_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(results, indent=2))
+    print(f"\nwrote {out}")
+    if args.compare:
+        return 1 if compare(results, json.loads(args.compare.read_text())) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+"""Benchmark: full sort_values().head(k) vs pipeline.top_k (argpartition).
+
+    python benchmarks/bench_topk.py [N ...]
+"""
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from pipeline import TOP_K, top_k
+
+
+def scored_pool(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    # rounded scores so ties are common, as they are with coarse FPL stats
+    return pd.DataFrame({
+        "Name": [f"player {i}" for i in range(n)],
+        "Score": np.round(rng.random(n) * 4, 2).astype(np.float32),
+    })
+
+
+def main(sizes):
+    for n in sizes:
+        df = scored_pool(n)
+        expected = df.sort_values("Score", ascending=False, kind="stable").head(TOP_K)
+        assert top_k(df).index.equals(expected.index)
+        reps = max(3, 200_000 // n)
+        t_sort = min(timeit.repeat(lambda: df.sort_values("Score", ascending=False).head(TOP_K), number=reps, repeat=5)) / reps
+        t_part = min(timeit.repeat(lambda: top_k(df), number=reps, repeat=5)) / reps
+        print(f"n={n:>7,}  sort+head {t_sort*1e3:8.3f} ms   argpartition {t_part*1e3:8.3f} ms   x{t_sort/t_part:5.1f}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [1_000, 10_000, 100_000])
@@ -0,0 +1,100 @@
+"""Synthetic DraftFantasy-like data for benchmarks (no network)."""
+import json
+
+import numpy as np
+import pandas as pd
+
+import pipeline
+import replay
+
+FIRST = ["Bukayo", "Martin", "Kai", "Erling", "Mohamed", "Heung-Min", "Ollie", "João", "Martin", "Luis",
+         "Bruno", "Cole", "Dominik", "Mykhailo", "N'Golo", "Joško", "Rúben", "Ibrahima", "Kaoru", "Pape Matar"]
+LAST = ["Saka", "Ødegaard", "Havertz", "Haaland", "Salah", "Son", "Watkins", "Félix", "Díaz", "Fernandes",
+        "Palmer", "Szoboszlai", "Mudryk", "Kanté", "Gvardiol", "Dias", "Konaté", "Mitoma", "Sarr", "O'Brien"]
+
+
+def names(n: int, seed: int = 0) -> pd.Series:
+    """n player names with accents, apostrophes and hyphens; ~n distinct values."""
+    rng = np.random.default_rng(seed)
+    first = rng.choice(FIRST, n)
+    last = rng.choice(LAST, n)
+    suffix = np.char.mod("%d", rng.integers(0, max(n // 20, 1), n))
+    return pd.Series([f"{f} {l}-{s}" for f, l, s in zip(first, last, suffix)], name="Name")
+
+
+SHORT_TO_CLUB = {short: club for club, short in reversed(pipeline.CLUB_TO_SHORT.items())}  # one label per club
+POSITIONS = ["GK", "DEF", "MID", "FWD"]
+EXTRA_ELEMENT_FIELDS = 40  # bootstrap elements carry ~90 fields the pipeline never reads
+
+
+def _letters(i: int) -> str:
+    out = ""
+    while True:
+        i, r = divmod(i, 26)
+        out = "abcdefghijklmnopqrstuvwxyz"[r] + out
+        if not i:
+            return out.capitalize()
+
+
+def recording(n: int, league_id: str, seed: int = 0, teams: int = 12, squad: int = 15) -> dict[str, bytes]:
+    """Upstream bodies for an n-player pool, keyed like a replay.py recording.
+
+    Every DraftFantasy player has an FPL element (web_name is the surname for
+    half of them, so matching is not all exact hits); `teams` league teams own
+    `squad` players each; the fixtures cover 8 gameweeks with one double.
+    """
+    rng = np.random.default_rng(seed)
+    shorts = list(SHORT_TO_CLUB)
+    # Letter suffixes keep names distinct after normalization (which drops digits), like real rosters.
+    names_ = [f"{name.rsplit('-', 1)[0]} {_letters(i)}" for i, name in enumerate(names(n, seed))]
+    team = rng.integers(0, len(shorts), n)
+    position = rng.integers(0, 4, n)
+
+    players = pd.DataFrame({
+        "Name": names_,
+        "Club": [SHORT_TO_CLUB[shorts[t]] for t in team],
+        "Position": [POSITIONS[p] for p in position],
+        "PointsPerGame": np.round(rng.random(n) * 8, 1),
+        "Goals": rng.integers(0, 20, n),
+        "Assists": rng.integers(0, 12, n),
+        "Clean Sheets": rng.integers(0, 15, n),
+        "Minutes": rng.integers(0, 3000, n),
+    })
+    elements = [
+        {
+            "id": i + 1, "first_name": name.split()[0], "second_name": name.split(maxsplit=1)[1],
+            "web_name": name.split(maxsplit=1)[1] if i % 2 else name, "team": int(t) + 1,
+            "element_type": int(p) + 1, "status": status, "chance_of_playing_next_round": chance,
+            "news": news, "ict_index": f"{ict:.1f}", "form": f"{form:.1f}",
+            **{f"stat_{k}": k for k in range(EXTRA_ELEMENT_FIELDS)},
+        }
+        for i, (name, t, p, status, chance, news, ict, form) in enumerate(zip(
+            names_, team, position,
+            rng.choice(["a", "a", "a", "d", "i", "u"], n),
+            rng.choice([None, 100, 75, 50, 0], n).tolist(),
+            rng.choice(["", "Knee injury. Expected back 01 Jan", "Returned to training"], n),
+            rng.random(n) * 100, rng.random(n) * 8,
+        ))
+    ]
+    fpl_teams = [{"id": i + 1, "name": SHORT_TO_CLUB[s], "short_name": s, "strength": 3} for i, s in enumerate(shorts)]
+    fixtures = []
+    for gw in range(10, 18):
+        order = rng.permutation(len(shorts)) + 1
+        fixtures += [{"event": gw, "team_h": int(h), "team_a": int(a),
+                      "team_h_difficulty": int(rng.integers(2, 6)), "team_a_difficulty": int(rng.integers(2, 6))}
+                     for h, a in zip(order[::2], order[1::2])]
+    fixtures.append({"event": 11, "team_h": 1, "team_a": 2, "team_h_difficulty": 2, "team_a_difficulty": 4})
+    owned = rng.choice(n, min(n, teams * squad), replace=False)
+    league = {"league": {"teams": [
+        {"id": f"team{t}", "name": f"Team {t}",
+         "teamPlayers": [{"player": {"name": names_[i]}} for i in owned[t * squad:(t + 1) * squad]]}
+        for t in range(teams)
+    ]}}
+
+    bodies = {
+        pipeline.CSV_URL: players.to_csv(index=False).encode(),
+        pipeline.LIVE_URL.format(league_id=league_id): json.dumps(league).encode(),
+        pipeline.FPL_BOOTSTRAP: json.dumps({"elements": elements, "teams": fpl_teams}).encode(),
+        pipeline.FPL_FIXTURES: json.dumps(fixtures).encode(),
+    }
+    return {replay.recording_name(url): body for url, body in bodies.items()}
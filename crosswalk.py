@@ -0,0 +1,95 @@
+"""Persisted DraftFantasy -> FPL player id crosswalk.
+
+The (Name, Club, Position) -> fpl_id table is built by the fuzzy matcher on
+the first run and stored as a CSV under the cache dir (editable by hand to fix
+a bad match; delete it to rebuild). Later runs resolve known players with one
+vectorized index lookup and only send players missing from the table, or whose
+FPL id has disappeared or was blanked by hand, through matching.match_players. A key shared by several
+pool rows (namesakes in the same club and position) is never stored: those rows
+go through the matcher every run, which assigns their ids one-to-one.
+"""
+import logging
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from storage import CACHE_ROOT, write_atomic
+from matching import MatchResult, match_players, match_result
+
+log = logging.getLogger(__name__)
+
+CROSSWALK_PATH = CACHE_ROOT / "crosswalk.csv"
+KEY = ["Name", "Club", "Position"]
+
+
+class Crosswalk:
+    def __init__(self, path: Path | None = None):
+        self.path = path
+        self._table: pd.DataFrame | None = None  # indexed by KEY: fpl_id, score
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    def _load(self) -> pd.DataFrame:
+        dtypes = {**dict.fromkeys(KEY, str), "fpl_id": "int64", "score": "float64"}
+        table = None
+        if self.path is not None and self.path.exists():
+            try:
+                table = pd.read_csv(self.path, dtype={**dtypes, "fpl_id": "Int64"})
+            except (ValueError, pd.errors.ParserError) as e:  # a bad hand edit must not fail every build
+                log.warning("crosswalk %s unreadable, rebuilding: %s", self.path, e)
+            if table is not None and not set(dtypes) <= set(table.columns):
+                table = None  # written with an older key; rebuild it
+        if table is not None:
+            # a blanked fpl_id sends that player back through the matcher
+            table = table.dropna(subset=["fpl_id"]).astype({"fpl_id": "int64"})
+        else:
+            table = pd.DataFrame({col: pd.Series(dtype=dt) for col, dt in dtypes.items()})
+        return table.drop_duplicates(KEY, keep="last").set_index(KEY)
+
+    def resolve(self, df_pool: pd.DataFrame, team_ids: pd.Series, fpl_players: pd.DataFrame) -> MatchResult:
+        """Map pool rows to FPL ids, matching and recording only players not yet in the table."""
+        with self._lock:
+            if self._table is None:
+                self._table = self._load()
+            table = self._table
+            keys = pd.MultiIndex.from_arrays([df_pool[col].astype(str) for col in KEY])
+            ambiguous = keys.duplicated(keep=False)
+            pos = np.where(ambiguous, -1, table.index.get_indexer(keys))
+            # -1 positions land on the appended sentinel
+            fpl_id = np.append(table["fpl_id"].to_numpy(), -1)[pos]
+            score = np.append(table["score"].to_numpy(), np.nan)[pos]
+            fpl_id[~np.isin(fpl_id, fpl_players["id"].to_numpy())] = -1
+
+            new = fpl_id == -1
+            if new.any():
+                free = fpl_players[~fpl_players["id"].isin(fpl_id[~new])]
+                m = match_players(df_pool[new], team_ids[new], free)
+                hit = m.fpl_id.notna().to_numpy()
+                rows = np.flatnonzero(new)[hit]
+                fpl_id[rows] = m.fpl_id[hit].to_numpy(dtype="int64")
+                score[rows] = m.score[hit].to_numpy()
+                rows = rows[~ambiguous[rows]]
+                if len(rows):
+                    added = pd.DataFrame({
+                        **{col: df_pool[col].iloc[rows].astype(str).to_numpy() for col in KEY},
+                        "fpl_id": fpl_id[rows],
+                        "score": score[rows],
+                    }).set_index(KEY)
+                    self._table = pd.concat([table[~table.index.isin(added.index)], added])
+                    self._dirty = True
+
+        return match_result(df_pool, fpl_players, fpl_id, score)
+
+    def save(self) -> None:
+        """Write the table to disk if new players were added since the last load/save."""
+        with self._lock:
+            if self.path is None or not self._dirty:
+                return
+            data = self._table.reset_index().to_csv(index=False)
+            self._dirty = False
+        write_atomic(self.path, data)
+
+
+crosswalk = Crosswalk(CROSSWALK_PATH)
@@ -0,0 +1,75 @@
+"""Team x gameweek fixture-difficulty matrix.
+
+Built once from the FPL fixtures payload (i.e. once per fixtures refresh) and
+sliced per rerun. Columns are consecutive gameweeks starting at the next one,
+so a gameweek nobody plays in is still a column. Within a cell, a double
+gameweek adds both fixtures' ease and a blank contributes 0.
+"""
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+MAX_HORIZON = 8  # gameweeks kept in the matrix; the UI horizon slices this
+HORIZON = 5
+DECAY = 0.8      # weight of gameweek n+1 relative to gameweek n
+
+FIXTURE_COLS = ["event","team_h","team_a","team_h_difficulty","team_a_difficulty"]
+
+
+class FixtureMatrix(NamedTuple):
+    team_ids: np.ndarray    # (teams,) FPL team ids, row order
+    events: np.ndarray      # (gws,) gameweek numbers, next one first
+    difficulty: np.ndarray  # (teams, gws) float32 mean FDR, NaN for a blank
+    ease: np.ndarray        # (teams, gws) float32 sum of (6 - FDR) over the team's fixtures
+    count: np.ndarray       # (teams, gws) int8 number of fixtures
+
+
+def team_gameweeks(fixtures: list | pd.DataFrame) -> pd.DataFrame:
+    """One row per (team, event) a team plays in: fixture count, summed ease, mean FDR.
+
+    A double gameweek is a single row with fixtures=2 and both fixtures' ease;
+    a blank simply has no row.
+    """
+    f = pd.DataFrame(fixtures, columns=FIXTURE_COLS).dropna(subset=["event"])
+    sides = pd.concat([
+        pd.DataFrame({"team": f["team_h"], "event": f["event"], "fdr": f["team_h_difficulty"]}),
+        pd.DataFrame({"team": f["team_a"], "event": f["event"], "fdr": f["team_a_difficulty"]}),
+    ], ignore_index=True).astype({"team": np.int64, "event": np.int64, "fdr": np.float32})
+    sides["ease"] = 6 - sides["fdr"]
+    return sides.groupby(["team", "event"], sort=False).agg(
+        fixtures=("fdr", "size"), ease=("ease", "sum"), fdr=("fdr", "mean"),
+    ).reset_index()
+
+
+def build_fixture_matrix(fixtures: list | pd.DataFrame, horizon: int = MAX_HORIZON) -> FixtureMatrix:
+    tg = team_gameweeks(fixtures)
+    first = tg["event"].min() if len(tg) else 1
+    events = np.arange(first, first + horizon)
+    tg = tg[tg["event"] < first + horizon]
+    team_ids = np.unique(tg["team"].to_numpy())
+    cell = (np.searchsorted(team_ids, tg["team"].to_numpy()), tg["event"].to_numpy() - first)
+
+    shape = (len(team_ids), horizon)
+    count = np.zeros(shape, np.int8)
+    ease = np.zeros(shape, np.float32)
+    difficulty = np.full(shape, np.nan, np.float32)
+    count[cell] = tg["fixtures"].to_numpy()  # groupby rows are unique per cell
+    ease[cell] = tg["ease"].to_numpy()
+    difficulty[cell] = tg["fdr"].to_numpy()
+    return FixtureMatrix(team_ids, events, difficulty, ease, count)
+
+
+def next_gameweek(m: FixtureMatrix) -> pd.DataFrame:
+    """Per FPL team id: fixtures, summed ease and mean FDR in the next gameweek (0/0/NaN on a blank)."""
+    return pd.DataFrame({
+        "fixtures": m.count[:, 0].astype(np.int64),
+        "ease": m.ease[:, 0].astype(float),
+        "fdr": m.difficulty[:, 0].astype(float),
+    }, index=m.team_ids)
+
+
+def run_ease(m: FixtureMatrix, horizon: int = HORIZON, decay: float = DECAY) -> pd.Series:
+    """Decay-weighted mean ease over the next `horizon` gameweeks, indexed by FPL team id."""
+    w = decay ** np.arange(min(horizon, m.ease.shape[1]), dtype=np.float32)
+    return pd.Series(m.ease[:, :len(w)] @ w / w.sum(), index=m.team_ids)
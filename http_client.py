@@ -0,0 +1,137 @@
+"""Shared, pooled HTTP client used by every upstream fetcher.
+
+One requests.Session per host keeps TCP/TLS connections alive between reruns
+and across Streamlit sessions (the module is imported once per process).
+Transient failures are retried with exponential backoff before surfacing.
+Large, slow-changing payloads can go through get_revalidated(), which keeps
+the body and its validators on disk and sends conditional requests; large
+payloads parsed once can use stream() to hand the socket straight to a parser.
+With WAIVER_REPLAY_URL set, every request goes to that replay server instead
+(see replay.py), so the app runs offline against recorded data.
+"""
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterator, TypeVar
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from storage import CACHE_ROOT, write_atomic
+from tracing import span
+
+TIMEOUT = 20          # seconds, per attempt
+POOL_MAXSIZE = 8      # concurrent connections kept alive per host
+CACHE_DIR = CACHE_ROOT / "http"
+REPLAY_URL = os.environ.get("WAIVER_REPLAY_URL")  # e.g. http://127.0.0.1:8765
+
+RETRY = Retry(
+    total=3,
+    backoff_factor=0.5,  # 0.5s, 1s, 2s
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=("GET", "HEAD"),
+    respect_retry_after_header=True,
+    raise_on_status=False,  # hand the last response to raise_for_status()
+)
+
+_sessions: dict[str, requests.Session] = {}
+_lock = threading.Lock()
+
+
+def session_for(url: str) -> requests.Session:
+    host = urlsplit(url).netloc
+    with _lock:
+        s = _sessions.get(host)
+        if s is None:
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE, max_retries=RETRY)
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            s.headers["User-Agent"] = "draft-waiver-assistant"
+            _sessions[host] = s
+    return s
+
+
+def replayed(url: str) -> str:
+    """`url` rewritten onto REPLAY_URL as /<host><path>?<query>; unchanged when replay is off."""
+    if not REPLAY_URL:
+        return url
+    parts = urlsplit(url)
+    return f"{REPLAY_URL.rstrip('/')}/{parts.netloc}{parts.path}" + (f"?{parts.query}" if parts.query else "")
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    kwargs.setdefault("timeout", TIMEOUT)
+    url = replayed(url)
+    with span("http.get", host=urlsplit(url).netloc) as s:
+        r = session_for(url).get(url, **kwargs)
+        s.set(status=r.status_code)
+        if not kwargs.get("stream"):  # a streamed body is counted by stream() once read
+            r.content  # read the whole body so the count below is final
+            s.set(bytes=r.raw.tell())  # bytes off the wire, i.e. before gunzip
+        r.raise_for_status()
+    return r
+
+
+@contextmanager
+def stream(url: str, **kwargs) -> Iterator[BinaryIO]:
+    """GET `url` and yield the body as a file object read off the socket in chunks.
+
+    gzip/deflate content-encoding (requested by default) is decoded as it is
+    read, so neither the compressed nor the decoded body is held in memory whole.
+    """
+    with span("http.stream") as s, get(url, stream=True, **kwargs) as r:
+        r.raw.decode_content = True
+        yield r.raw
+        s.set(bytes=r.raw.tell())  # bytes off the wire, i.e. before gunzip
+
+
+T = TypeVar("T")
+
+# url -> (version, parsed value); lets a 304 skip parsing as well as the transfer
+_parsed: dict[str, tuple[str, object]] = {}
+
+
+def _cache_paths(url: str) -> tuple[Path, Path]:
+    key = hashlib.sha1(url.encode()).hexdigest()
+    return CACHE_DIR / f"{key}.body", CACHE_DIR / f"{key}.meta.json"
+
+
+def get_revalidated(url: str, parse: Callable[[bytes], T]) -> T:
+    """GET `url` with ETag/Last-Modified revalidation and return parse(body).
+
+    On 304 the previously parsed value is reused (or the stored body is
+    re-parsed after a restart), so neither the transfer nor parse() is repeated.
+    """
+    body_path, meta_path = _cache_paths(url)
+    meta = {}
+    if body_path.exists() and meta_path.exists():
+        meta = json.loads(meta_path.read_text())
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+
+    r = get(url, headers=headers)
+    if r.status_code == 304 and meta:
+        version = meta["version"]
+        hit = _parsed.get(url)
+        if hit and hit[0] == version:
+            return hit[1]
+        value = parse(body_path.read_bytes())
+    else:
+        etag, last_modified = r.headers.get("ETag"), r.headers.get("Last-Modified")
+        version = etag or last_modified or hashlib.sha1(r.content).hexdigest()
+        value = parse(r.content)
+        if etag or last_modified:
+            write_atomic(body_path, r.content)
+            write_atomic(meta_path, json.dumps(
+                {"etag": etag, "last_modified": last_modified, "version": version}).encode())
+    _parsed[url] = (version, value)
+    return value
@@ -0,0 +1,137 @@
+"""DraftFantasy -> FPL player matching.
+
+Exact name keys miss players whose names are spelled differently on the two
+sites ("Bukayo Saka" vs web_name "Saka", dropped accents, nicknames), while
+comparing every pair is O(n*m). Candidates are instead drawn from a blocking
+index: the player's (FPL team, position) block first, and a trigram inverted
+index over all FPL names when the club is unknown or the block has no good
+candidate. An exact name at another club is only a fallback, scored below a
+same-club hit. FPL's abbreviated web names ("B.Fernandes", "Diogo J.") match
+through their initials. Assignment is one-to-one, best score first.
+"""
+from collections import defaultdict
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from names import normalize_names
+
+POSITIONS = {1: "GK", 2: "DEF", 3: "MID", 4: "FWD"}  # FPL element_type
+MIN_SCORE = 0.6         # within a (team, position) block
+MIN_SCORE_GLOBAL = 0.8  # name-only candidates need more evidence
+MAX_GLOBAL_CANDIDATES = 20
+ALIAS_OTHER_CLUB = 0.9  # exact name, but only at another FPL team
+
+
+class MatchResult(NamedTuple):
+    fpl_id: pd.Series          # aligned to the pool index, <NA> when unmatched
+    score: pd.Series           # 0..1 match confidence, NaN when unmatched
+    unmatched_pool: pd.DataFrame
+    unmatched_fpl: pd.DataFrame
+
+
+def match_result(df_pool: pd.DataFrame, fpl_players: pd.DataFrame, fpl_id: np.ndarray, score: np.ndarray) -> MatchResult:
+    """MatchResult from per-row FPL ids (-1 = unmatched) and scores, both aligned to df_pool."""
+    matched = fpl_id != -1
+    return MatchResult(
+        fpl_id=pd.Series(pd.array(np.where(matched, fpl_id, 0), dtype="Int64"), index=df_pool.index).where(matched),
+        score=pd.Series(np.where(matched, score, np.nan), index=df_pool.index),
+        unmatched_pool=df_pool.loc[~matched, ["Name", "Club", "Position"]],
+        unmatched_fpl=fpl_players.loc[~np.isin(fpl_players["id"], fpl_id[matched]),
+                                      ["id", "web_name", "first_name", "second_name", "team", "element_type"]],
+    )
+
+
+def _trigrams(s: str) -> set[str]:
+    s = f"  {s} "
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+
+def _jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+def _initials_match(web: set, tokens: set) -> bool:
+    """One-letter web tokens ("b" in "b fernandes") are initials of other pool tokens; every full web token must match."""
+    full = {t for t in web if len(t) > 1}
+    initials = web - full
+    rest = tokens - full
+    return bool(full and initials) and full <= tokens and all(any(t.startswith(i) for t in rest) for i in initials)
+
+
+class _FplIndex:
+    def __init__(self, fpl_players: pd.DataFrame):
+        web = normalize_names(fpl_players["web_name"]).tolist()
+        full = normalize_names(fpl_players["first_name"].astype(str) + " " + fpl_players["second_name"].astype(str)).tolist()
+        second = normalize_names(fpl_players["second_name"]).tolist()
+        self.ids = fpl_players["id"].to_numpy()
+        self.teams = fpl_players["team"].tolist()
+        self.aliases = [{w, f, s} for w, f, s in zip(web, full, second)]
+        self.web_tokens = [set(w.split()) for w in web]
+        self.grams = [_trigrams(w) | _trigrams(f) for w, f in zip(web, full)]
+        self.full_grams = [(_trigrams(w), _trigrams(f)) for w, f in zip(web, full)]
+        positions = fpl_players["element_type"].map(POSITIONS)
+        self.blocks = defaultdict(list)
+        for row, key in enumerate(zip(fpl_players["team"].tolist(), positions.tolist())):
+            self.blocks[key].append(row)
+        self.by_alias = defaultdict(list)
+        for row, aliases in enumerate(self.aliases):
+            for a in aliases:
+                self.by_alias[a].append(row)
+        self.by_gram = defaultdict(list)
+        for row, grams in enumerate(self.grams):
+            for g in grams:
+                self.by_gram[g].append(row)
+
+    def score(self, name: str, tokens: set, grams: set, row: int) -> float:
+        if name in self.aliases[row]:
+            return 1.0
+        if self.web_tokens[row] and self.web_tokens[row] <= tokens:
+            return 0.95  # "Saka" inside "Bukayo Saka"
+        if _initials_match(self.web_tokens[row], tokens):
+            return 0.9
+        web_g, full_g = self.full_grams[row]
+        return max(_jaccard(grams, web_g), _jaccard(grams, full_g))
+
+    def global_candidates(self, grams: set) -> list[int]:
+        counts = defaultdict(int)
+        for g in grams:
+            for row in self.by_gram.get(g, ()):
+                counts[row] += 1
+        return sorted(counts, key=counts.get, reverse=True)[:MAX_GLOBAL_CANDIDATES]
+
+
+def match_players(df_pool: pd.DataFrame, team_ids: pd.Series, fpl_players: pd.DataFrame) -> MatchResult:
+    """Match pool rows (Name_norm, Position) to FPL ids; `team_ids` is the pool's FPL team id per row."""
+    index = _FplIndex(fpl_players)
+    pairs = []  # (score, pool_pos, fpl_row)
+    rows = zip(df_pool["Name_norm"].tolist(), df_pool["Position"].tolist(), team_ids.tolist())
+    for pos, (name, position, team) in enumerate(rows):
+        block = index.blocks.get((team, position), ())
+        exact = index.by_alias.get(name, [])
+        if pd.isna(team):
+            hits = exact
+        else:
+            hits = [r for r in exact if r in block] or [r for r in exact if index.teams[r] == team]
+        if hits:  # an exact alias hit at the player's club (or with no club to check) needs no scoring
+            pairs.extend((1.0, pos, r) for r in hits)
+            continue
+        tokens, grams = set(name.split()), _trigrams(name)
+        best = [(index.score(name, tokens, grams, r), pos, r) for r in block]
+        best = [p for p in best if p[0] >= MIN_SCORE]
+        if not best and exact:  # the name only exists at other clubs, e.g. after a transfer
+            best = [(ALIAS_OTHER_CLUB, pos, r) for r in exact]
+        if not best:
+            best = [(index.score(name, tokens, grams, r), pos, r) for r in index.global_candidates(grams)]
+            best = [p for p in best if p[0] >= MIN_SCORE_GLOBAL]
+        pairs.extend(best)
+
+    fpl_id = np.full(len(df_pool), -1, dtype=np.int64)
+    scores = np.full(len(df_pool), np.nan)
+    taken = set()
+    for s, pos, r in sorted(pairs, key=lambda p: -p[0]):
+        if fpl_id[pos] == -1 and r not in taken:
+            fpl_id[pos], scores[pos] = index.ids[r], s
+            taken.add(r)
+    return match_result(df_pool, fpl_players, fpl_id, scores)
@@ -0,0 +1,101 @@
+"""Player-name normalization.
+
+Name_norm is the ASCII-folded, lower-cased name with every run of non-letters
+collapsed to one space. It keys live ownership (roster names) and is what the
+FPL matcher compares.
+
+Names barely change over a season, so results are kept in a bounded LRU memo
+that is persisted under the cache dir; only names not seen before go through
+the pandas string methods (Arrow compute kernels when strings are Arrow-backed).
+"""
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from storage import CACHE_ROOT, write_atomic
+
+MEMO_MAXSIZE = 50_000
+MEMO_PATH = CACHE_ROOT / "names.json"
+
+
+class NameMemo:
+    """Bounded LRU of raw name -> Name_norm, optionally backed by a JSON file."""
+
+    def __init__(self, maxsize: int = MEMO_MAXSIZE, path: Path | None = None):
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self._loaded = path is None
+        self._dirty = False
+
+    def _load(self) -> None:
+        self._loaded = True
+        if self.path is not None and self.path.exists():
+            for name, name_norm, *_ in json.loads(self.path.read_text()):  # older files also carry name_key
+                self._data[name] = name_norm
+
+    def get_many(self, names) -> list[str | None]:
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            out = []
+            for name in names:
+                keys = self._data.get(name)
+                if keys is not None:
+                    self._data.move_to_end(name)
+                out.append(keys)
+            found = sum(k is not None for k in out)
+            self.hits += found
+            self.misses += len(out) - found
+            return out
+
+    def put_many(self, items) -> None:
+        with self._lock:
+            for name, keys in items:
+                self._data[name] = keys
+                self._data.move_to_end(name)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            self._dirty = True
+
+    def save(self) -> None:
+        """Write the memo to disk if it changed since the last load/save."""
+        with self._lock:
+            if self.path is None or not self._dirty:
+                return
+            rows = list(self._data.items())
+            self._dirty = False
+        write_atomic(self.path, json.dumps(rows, ensure_ascii=False))
+
+
+memo = NameMemo(MEMO_MAXSIZE, MEMO_PATH)
+
+
+def _fold(names: pd.Series) -> pd.Series:
+    return (
+        names.str.normalize("NFKD")
+        .str.replace(r"[^\x00-\x7f]+", "", regex=True)
+        .str.lower()
+        .str.replace(r"[^a-z]+", " ", regex=True)
+        .str.strip()
+    )
+
+
+def normalize_names(names: pd.Series) -> pd.Series:
+    """Name_norm for a Series of names, folding each distinct unseen name once."""
+    codes, uniques = pd.factorize(names.astype(str))
+    uniques = uniques.tolist()  # one bulk conversion; iterating Arrow arrays is per-element slow
+    keys = memo.get_many(uniques)
+    missing = [name for name, k in zip(uniques, keys) if k is None]
+    if missing:
+        fresh = dict(zip(missing, _fold(pd.Series(missing, dtype=str)).tolist()))
+        memo.put_many(fresh.items())
+        keys = [k if k is not None else fresh[name] for name, k in zip(uniques, keys)]
+    return pd.Series(np.array(keys, dtype=object)[codes], index=names.index, name="Name_norm")
@@ -0,0 +1,515 @@
+"""Waiver ranking pipeline, free of any Streamlit calls.
+
+Stages: fetch -> normalize -> merge -> features -> score -> top-k -> prompt.
+Every stage takes and returns plain DataFrames/dicts so it can be imported,
+profiled and run headless. features() packs the normalized inputs into a
+float32 matrix and only score() depends on the weights, so callers can cache
+features() per (pool, min_avail, horizon) and redo just the matmul when a
+weight changes (score_batch() ranks many weight vectors at once):
+
+    python pipeline.py LEAGUE_ID [TEAM_ID]
+"""
+import contextvars
+import importlib.util
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+import http_client
+import names
+from crosswalk import crosswalk
+from fixtures import FIXTURE_COLS, HORIZON, FixtureMatrix, build_fixture_matrix, next_gameweek, run_ease
+from matching import MatchResult
+from names import normalize_names
+from snapshots import store
+from tracing import span, traced
+
+CSV_URL   = "https://app.draftfantasy.com/api/players/csv"
+LIVE_URL  = "https://app.draftfantasy.com/api/league/{league_id}/transfers-data"
+
+# FPL (free, no auth)
+FPL_BOOTSTRAP = "https://fantasy.premierleague.com/api/bootstrap-static/"
+FPL_FIXTURES  = "https://fantasy.premierleague.com/api/fixtures/?future=1"
+
+TOP_K = 25
+POSITION_K = 10  # per-position leaderboard size
+POSITIONS = ["GK", "DEF", "MID", "FWD"]
+RANK_COLS = ["Name","Club","Position","Point per game","Goals","Assists","Clean sheets",
+             "FixtureEase","RunEase","ict_index","chance_of_playing_next_round","news","Score"]
+
+
+class Weights(NamedTuple):
+    ppg: float = 1.0
+    ict: float = 0.6
+    fix: float = 0.8
+    form: float = 0.6
+    run: float = 0.6   # decayed fixture ease over the horizon
+
+# Raw columns behind each feature-matrix column, in Weights order
+FEATURE_COLS = ["Point per game", "ict_index", "FixtureEase", "form", "RunEase"]
+RETURNING_BONUS = 0.05
+
+
+class Features(NamedTuple):
+    """Free players plus their min-max normalized feature matrix (row i <-> df.iloc[i])."""
+    df: pd.DataFrame
+    X: np.ndarray      # (players, len(FEATURE_COLS)) float32, C-contiguous
+    bonus: np.ndarray  # (players,) float32 returning-from-injury nudge
+
+
+class Pool(NamedTuple):
+    """One merged snapshot of every source; shared between sessions, treat as read-only."""
+    df: pd.DataFrame
+    players_by_team: dict
+    teams_index: list
+    total_names: int
+    match: MatchResult
+    fixtures: FixtureMatrix
+    built_at: float  # identifies the snapshot for downstream caches
+    trace: tuple = ()  # tracing.Span records of the fetch + build that produced it
+
+
+# --------------- Schema ----------------
+# Applied at load time so every cached snapshot is compact: repeated labels become
+# categoricals (cheap ==/isin on the codes), stats float32 and counts small ints.
+# The DraftFantasy CSV is parsed straight into its schema, and only these columns are
+# read; a missing or mistyped column raises SchemaError instead of turning into NaN.
+PLAYERS_DTYPES = {
+    "Name": "str", "Club": "category", "Position": "category", "PointsPerGame": "float32",
+    "Goals": "Int16", "Assists": "Int16", "Clean Sheets": "Int16",
+}
+CSV_ENGINE = "pyarrow" if importlib.util.find_spec("pyarrow") else "c"
+FPL_PLAYERS_DTYPES = {
+    "id": "int32", "team": "int16", "element_type": "int8", "status": "category",
+    "chance_of_playing_next_round": "float32", "ict_index": "float32", "form": "float32",
+}
+
+class SchemaError(ValueError):
+    """An upstream payload no longer has the columns/types the pipeline declares."""
+
+def apply_schema(df: pd.DataFrame, dtypes: dict) -> pd.DataFrame:
+    """Cast the columns of df named in dtypes; numeric targets go through pd.to_numeric first."""
+    dtypes = {col: dt for col, dt in dtypes.items() if col in df.columns}
+    df = df.copy()
+    for col, dt in dtypes.items():
+        if dt not in ("category", "str"):
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df.astype(dtypes)
+
+def read_players_csv(source) -> pd.DataFrame:
+    """Parse the DraftFantasy export (path or file-like) into PLAYERS_DTYPES, skipping other columns."""
+    try:
+        return pd.read_csv(source, usecols=list(PLAYERS_DTYPES), dtype=PLAYERS_DTYPES, engine=CSV_ENGINE)
+    except (ValueError, KeyError) as e:  # unknown usecols / bad cast, from either engine
+        raise SchemaError(f"DraftFantasy players CSV does not match PLAYERS_DTYPES: {e}") from e
+
+# --------------- Helpers ----------------
+def minmax_columns(X: np.ndarray) -> np.ndarray:
+    """Scale each column of X to 0..1 in place; constant columns become 0."""
+    lo = X.min(axis=0) if len(X) else np.zeros(X.shape[1], X.dtype)
+    span = (X.max(axis=0) if len(X) else lo) - lo
+    X -= lo
+    np.divide(X, span, out=X, where=span > 0)  # constant columns are already 0 after -= lo
+    return X
+
+def extract_player_name(p):
+    return (
+        p.get("name")
+        or (p.get("player") or {}).get("name")
+        or p.get("playerName")
+        or (p.get("data") or {}).get("name")
+        or (p.get("ws") or {}).get("name")
+        or (p.get("info") or {}).get("name")
+    )
+
+# --------------- Fetch ----------------
+# Every fetcher snapshots what it received (snapshots.store) before deriving anything from it.
+def league_roster(data: dict) -> pd.DataFrame:
+    """transfers-data payload -> one row per (team, rostered player); a team with no players has player=None."""
+    league = data.get("league", data)
+    rows = []
+    for t in league.get("teams", []):
+        tname = t.get("name") or t.get("teamName") or "-"
+        tid = str(t.get("id") or t.get("teamId") or "").strip()
+        roster = (
+            t.get("teamPlayers")
+            or t.get("players")
+            or t.get("squad")
+            or t.get("roster")
+            or []
+        )
+        names_ = [pname for pname in map(extract_player_name, roster) if pname]
+        rows.extend((tid, tname, pname) for pname in names_ or [None])
+    return pd.DataFrame(rows, columns=["team_id", "team_name", "player"], dtype=str)
+
+def league_from_roster(roster: pd.DataFrame):
+    """(owner_by_name, players_by_team, teams_index, total rostered) from league_roster() rows."""
+    players_by_team, teams_index = {}, []
+    for tid, tname in zip(roster["team_id"].tolist(), roster["team_name"].tolist()):
+        if tid not in players_by_team:
+            players_by_team[tid] = []
+            teams_index.append((tid, tname))
+    rostered = roster[roster["player"].notna()]
+    for tid, pname in zip(rostered["team_id"].tolist(), rostered["player"].tolist()):
+        players_by_team[tid].append(pname)
+    name_norm = normalize_names(rostered["player"])
+    owner_by_name = dict(zip(name_norm.tolist(), rostered["team_name"].tolist()))
+    return owner_by_name, players_by_team, teams_index, len(rostered)
+
+def fetch_live_league(league_id: str):
+    roster = league_roster(http_client.get(LIVE_URL.format(league_id=league_id)).json())
+    store.save(f"league_{league_id}", roster)
+    return league_from_roster(roster)
+
+def fetch_players_csv() -> pd.DataFrame:
+    # Streamed: the parser pulls (gunzipped) chunks off the socket instead of a buffered copy of the export.
+    with http_client.stream(CSV_URL) as body:
+        df = read_players_csv(body)
+    store.save("players", df)
+    return df
+
+FPL_ELEMENT_COLS = ["id","first_name","second_name","web_name","team","element_type","status",
+                    "chance_of_playing_next_round","news","ict_index","form"]
+FPL_TEAM_COLS = ["id","name","short_name"]
+
+def _records(bs: dict, key: str, cols: list) -> pd.DataFrame:
+    # Only `cols` are pulled out of each record; the other ~90 element fields never become columns.
+    rows = bs[key]
+    missing = [c for c in cols if rows and c not in rows[0]]
+    if missing:
+        raise SchemaError(f"FPL bootstrap-static {key!r} records lack {missing}")
+    return pd.DataFrame(rows, columns=cols)
+
+def parse_bootstrap(body: bytes):
+    bs = json.loads(body)
+    fpl_players = apply_schema(_records(bs, "elements", FPL_ELEMENT_COLS), FPL_PLAYERS_DTYPES)
+    fpl_teams = _records(bs, "teams", FPL_TEAM_COLS)
+    return fpl_players, fpl_teams
+
+def fetch_fpl_bootstrap():
+    # Multi-MB and rarely changes: revalidate with ETag/Last-Modified, 304 reuses the parsed frames.
+    fpl_players, fpl_teams = http_client.get_revalidated(FPL_BOOTSTRAP, parse_bootstrap)
+    store.save("fpl_players", fpl_players)  # no-ops when a 304 handed back the same frames
+    store.save("fpl_teams", fpl_teams)
+    return fpl_players, fpl_teams
+
+def fetch_fpl_fixtures() -> FixtureMatrix:
+    # The team x gameweek matrix is built here so it is computed once per fixtures refresh.
+    fixtures = pd.DataFrame(http_client.get(FPL_FIXTURES).json(), columns=FIXTURE_COLS)
+    store.save("fixtures", fixtures)
+    return build_fixture_matrix(fixtures)
+
+FETCHERS = {
+    "league":    fetch_live_league,
+    "players":   fetch_players_csv,
+    "bootstrap": fetch_fpl_bootstrap,
+    "fixtures":  fetch_fpl_fixtures,
+}
+
+def _fetch(name: str, fn: Callable, *args):
+    # A fetch span without an http.* child was answered by a cache in front of the fetcher.
+    with span(f"fetch.{name}", source=name):
+        return fn(*args)
+
+def fetch_all(league_id: str, fetchers: dict[str, Callable] | None = None,
+              initializer: Callable[[], None] | None = None) -> dict:
+    # Run the four fetches side by side so a cold load costs the slowest call, not the sum.
+    # Each task runs in its own copy of the caller's context so its spans nest under the caller's.
+    fetchers = fetchers or FETCHERS
+    with span("fetch_all"), ThreadPoolExecutor(max_workers=len(fetchers), initializer=initializer) as pool:
+        futures = {
+            name: pool.submit(contextvars.copy_context().run, _fetch, name, fn,
+                              *((league_id,) if name == "league" else ()))
+            for name, fn in fetchers.items()
+        }
+        return {name: f.result() for name, f in futures.items()}
+
+def fetch_diagnostics(trace: tuple) -> pd.DataFrame:
+    """Per source from a pool's trace: fetch time, cache outcome, HTTP status and bytes off the wire."""
+    records = [s.record() for s in trace]
+    children = {}
+    for r in records:
+        children.setdefault(r["parent"], []).append(r)
+
+    def descendants(span_id):
+        for c in children.get(span_id, []):
+            yield c
+            yield from descendants(c["id"])
+
+    rows = []
+    for r in records:
+        if not r["span"].startswith("fetch."):
+            continue
+        calls = [c for c in descendants(r["id"]) if c["span"].startswith("http.")]
+        status = [c["status"] for c in calls if "status" in c]
+        rows.append({
+            "source": r["source"], "ms": r["ms"],
+            # no HTTP call: served by a cache in front of the fetcher (st.cache_data in the app)
+            "cache": "revalidated" if 304 in status else "miss" if calls else "hit",
+            "status": status[-1] if status else None,
+            "wire_bytes": sum(c.get("bytes", 0) for c in calls) if calls else None,
+            "error": r.get("error"),
+        })
+    return pd.DataFrame(rows, columns=["source", "ms", "cache", "status", "wire_bytes", "error"])
+
+def load_snapshot(league_id: str) -> tuple[dict, float] | None:
+    """fetch_all()-shaped data from the newest stored snapshots, and the oldest of their timestamps.
+
+    None unless every source has a snapshot.
+    """
+    frames = {name: store.load(name) for name in
+              (f"league_{league_id}", "players", "fpl_players", "fpl_teams", "fixtures")}
+    if any(v is None for v in frames.values()):
+        return None
+    (roster, _), (players, _), (fpl_players, _), (fpl_teams, _), (fixtures, _) = frames.values()
+    fetched = {
+        "league": league_from_roster(roster),
+        "players": players,
+        "bootstrap": (fpl_players, fpl_teams),
+        "fixtures": build_fixture_matrix(fixtures),
+    }
+    return fetched, min(taken for _, taken in frames.values())
+
+# --------------- Normalize + merge ----------------
+# Club label mapping (DraftFantasy CSV -> FPL short names)
+CLUB_TO_SHORT = {
+    "Arsenal":"ARS","Aston Villa":"AVL","Bournemouth":"BOU","Brentford":"BRE","Brighton":"BHA",
+    "Chelsea":"CHE","Crystal Palace":"CRY","Everton":"EVE","Fulham":"FUL","Ipswich":"IPS",
+    "Leicester":"LEI","Liverpool":"LIV","Man City":"MCI","Man Utd":"MUN","Newcastle":"NEW",
+    "Nott'm Forest":"NFO","Nottingham Forest":"NFO","Southampton":"SOU","Spurs":"TOT","West Ham":"WHU","Wolves":"WOL",
+}
+
+def club_team_ids(clubs: pd.Series, fpl_teams: pd.DataFrame) -> pd.Series:
+    """DraftFantasy club labels -> FPL team ids (<NA> for clubs missing from CLUB_TO_SHORT)."""
+    short_to_id = pd.Series(fpl_teams["id"].to_numpy(), index=fpl_teams["short_name"].to_numpy())
+    return clubs.map(CLUB_TO_SHORT).map(short_to_id).astype("Int16")
+
+@traced("normalize")
+def normalize_players(df_pool: pd.DataFrame) -> pd.DataFrame:
+    df_pool = df_pool.copy()
+    df_pool["Name_norm"] = normalize_names(df_pool["Name"])
+    return df_pool.rename(columns={
+        "PointsPerGame": "Point per game",
+        "Clean Sheets": "Clean sheets",
+    })
+
+# merge_pool() stages; each returns a new frame (assign() shares the untouched columns).
+@traced("fdr")
+def with_fixtures(df_pool: pd.DataFrame, fpl_teams: pd.DataFrame, fpl_fixtures: FixtureMatrix) -> pd.DataFrame:
+    """Add team_id and next-gameweek Fixtures_next / FixtureEase / FDR_next.
+
+    A double adds both fixtures' ease, a blank is 0. Team ids missing from the
+    fixtures have no game in the horizon; unknown clubs stay NaN.
+    """
+    team_id = club_team_ids(df_pool["Club"], fpl_teams)
+    nxt = next_gameweek(fpl_fixtures)
+    blank = team_id.notna() & ~team_id.isin(nxt.index)
+    return df_pool.assign(
+        team_id=team_id,
+        Fixtures_next=team_id.map(nxt["fixtures"]).mask(blank, 0).astype("Int8"),
+        FixtureEase=team_id.map(nxt["ease"]).astype(np.float32).mask(blank, 0.0),
+        FDR_next=team_id.map(nxt["fdr"]).astype(np.float32),
+    )
+
+@traced("merge")
+def with_fpl(df_pool: pd.DataFrame, fpl_players: pd.DataFrame) -> tuple[pd.DataFrame, MatchResult]:
+    """Merge FPL availability/ICT/form on the FPL id from the persisted crosswalk (fuzzy-matched for new players)."""
+    match = crosswalk.resolve(df_pool, df_pool["team_id"], fpl_players)
+    fpl_sub = fpl_players[["id","status","chance_of_playing_next_round","news","ict_index","form"]]
+    fpl_sub = fpl_sub.assign(id=fpl_sub["id"].astype("Int64")).rename(columns={"id": "fpl_id"})
+    return df_pool.assign(fpl_id=match.fpl_id).merge(fpl_sub, on="fpl_id", how="left"), match
+
+@traced("availability")
+def with_availability(df_pool: pd.DataFrame) -> pd.DataFrame:
+    return df_pool.assign(
+        Available_nextGW=(
+            (df_pool["status"].isin(["a","d"])) &
+            (df_pool["chance_of_playing_next_round"].fillna(100) >= 75)
+        ),
+        Returning_flag=df_pool["news"].fillna("").str.contains("available|returned|back|fit", case=False, regex=True),
+    )
+
+@traced("ownership")
+def with_owner(df_pool: pd.DataFrame, owner_by_name: dict) -> pd.DataFrame:
+    # Ownership (LIVE) by name
+    return df_pool.assign(Owner=df_pool["Name_norm"].map(owner_by_name).fillna("-").astype("category"))
+
+def merge_pool(df_pool: pd.DataFrame, owner_by_name: dict, fpl_players: pd.DataFrame,
+               fpl_teams: pd.DataFrame, fpl_fixtures: FixtureMatrix) -> tuple[pd.DataFrame, MatchResult]:
+    """Join normalized DraftFantasy rows with FPL fixtures/availability and live ownership."""
+    df_pool, match = with_fpl(with_fixtures(df_pool, fpl_teams, fpl_fixtures), fpl_players)
+    return with_owner(with_availability(df_pool), owner_by_name), match
+
+@traced("build_pool")
+def build_pool(fetched: dict) -> Pool:
+    """Turn fetch_all() output into a merged Pool snapshot."""
+    owner_by_name, players_by_team, teams_index, total_names = fetched["league"]
+    fpl_players, fpl_teams = fetched["bootstrap"]
+    df_pool, match = merge_pool(normalize_players(fetched["players"]), owner_by_name,
+                                fpl_players, fpl_teams, fetched["fixtures"])
+    names.memo.save()
+    crosswalk.save()
+    return Pool(df_pool, players_by_team, teams_index, total_names, match, fetched["fixtures"], time.time())
+
+# --------------- Rank ----------------
+def filter_available(df_pool: pd.DataFrame, min_avail: str = "75%+ only") -> pd.DataFrame:
+    # Filter to truly free
+    df_avail = df_pool[df_pool["Owner"] == "-"].copy()
+    if min_avail == "75%+ only":
+        df_avail = df_avail[(df_avail["Available_nextGW"]) | (df_avail["chance_of_playing_next_round"].isna())]
+    return df_avail
+
+def with_run_ease(df_avail: pd.DataFrame, fixtures: FixtureMatrix, horizon: int = HORIZON) -> pd.DataFrame:
+    """Add RunEase, the decay-weighted fixture ease over the next `horizon` gameweeks."""
+    df_avail = df_avail.copy()
+    df_avail["RunEase"] = df_avail["team_id"].map(run_ease(fixtures, horizon)).astype(np.float32)
+    return df_avail
+
+@traced("features")
+def features(df_pool: pd.DataFrame, fixtures: FixtureMatrix, min_avail: str = "75%+ only",
+             horizon: int = HORIZON) -> Features:
+    """Free players and their normalized feature matrix; independent of the weights."""
+    df_avail = with_run_ease(filter_available(df_pool, min_avail), fixtures, horizon)
+    X = np.empty((len(df_avail), len(FEATURE_COLS)), dtype=np.float32)
+    for j, col in enumerate(FEATURE_COLS):
+        X[:, j] = pd.to_numeric(df_avail[col], errors="coerce").fillna(0).to_numpy(dtype=np.float32)
+    bonus = RETURNING_BONUS * df_avail["Returning_flag"].fillna(False).to_numpy(dtype=np.float32)
+    return Features(df_avail, minmax_columns(X), bonus)
+
+def score_batch(feat: Features, W) -> np.ndarray:
+    """Scores for a batch of weight vectors (rows of W, in Weights order) -> (players, batch)."""
+    W = np.asarray(W, dtype=np.float32).reshape(-1, len(FEATURE_COLS))
+    return feat.X @ W.T + feat.bonus[:, None]
+
+@traced("score")
+def score(feat: Features, weights: Weights = Weights()) -> pd.DataFrame:
+    # feat may be shared between sessions, so the scores go on a new frame.
+    return feat.df.assign(Score=score_batch(feat, weights)[:, 0])
+
+def topk_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the k highest scores, best first; ties keep row order, NaN ranks last.
+
+    argpartition finds the k-th best in O(n); only rows at or above it get sorted.
+    """
+    scores = np.nan_to_num(np.asarray(scores, dtype=np.float64), nan=-np.inf)
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < len(scores):
+        kth = scores[np.argpartition(-scores, k - 1)[k - 1]]
+        cand = np.flatnonzero(scores >= kth)  # keeps every row tied with the k-th
+    else:
+        cand = np.arange(len(scores))
+    return cand[np.lexsort((cand, -scores[cand]))][:k]
+
+@traced("top_k")
+def top_k(df_scored: pd.DataFrame, k: int = TOP_K) -> pd.DataFrame:
+    return df_scored.iloc[topk_indices(df_scored["Score"].to_numpy(), k)]
+
+@traced("top_k_by_position")
+def top_k_by_position(df_scored: pd.DataFrame, k: int = POSITION_K) -> pd.DataFrame:
+    """Top k per position in one pass: rows ordered GK, DEF, MID, FWD, best first within each.
+
+    A single lexsort on (position, -score, row) puts each group's leaders first;
+    rank within the group is the distance from the group's first row.
+    """
+    group = pd.Index(POSITIONS).get_indexer(df_scored["Position"])  # -1 for an unknown position
+    scores = np.nan_to_num(df_scored["Score"].to_numpy(dtype=np.float64), nan=-np.inf)
+    rows = np.arange(len(df_scored))
+    order = np.lexsort((rows, -scores, group))
+    g = group[order]
+    starts = np.flatnonzero(np.r_[True, g[1:] != g[:-1]]) if len(g) else np.empty(0, dtype=np.intp)
+    rank = rows - np.repeat(starts, np.diff(np.r_[starts, len(g)]))
+    return df_scored.iloc[order[(rank < k) & (g >= 0)]]
+
+# --------------- Prompt ----------------
+def find_my_squad(players_by_team: dict, teams_index: list, team_id: str, team_name_hint: str = "") -> list:
+    my_names = players_by_team.get(str(team_id).strip())
+    if (not my_names) and team_name_hint:
+        for t_tid, t_name in teams_index:
+            if t_name.strip().lower() == team_name_hint.strip().lower():
+                my_names = players_by_team.get(t_tid)
+                break
+    return my_names or []
+
+def build_my_squad_text_from_names(names: list, df_pool: pd.DataFrame) -> str:
+    if not names:
+        return ""
+    df_my = df_pool[df_pool["Name"].isin(set(names))].copy()
+    lines = {
+        "GK": ", ".join(df_my[df_my["Position"]=="GK"]["Name"].tolist()),
+        "DEF": ", ".join(df_my[df_my["Position"]=="DEF"]["Name"].tolist()),
+        "MID": ", ".join(df_my[df_my["Position"]=="MID"]["Name"].tolist()),
+        "FWD": ", ".join(df_my[df_my["Position"]=="FWD"]["Name"].tolist()),
+    }
+    return "\n".join([
+        f"GK: {lines['GK']}",
+        f"DEF: {lines['DEF']}",
+        f"MID: {lines['MID']}",
+        f"FWD: {lines['FWD']}",
+    ])
+
+def _fmt1(x) -> str:
+    # Stats are float32; iterrows() widens them to float64, so print at the source precision.
+    return f"{x:.1f}" if pd.notna(x) else "—"
+
+@traced("build_prompt")
+def build_prompt(df_top: pd.DataFrame, my_squad_text: str, df_by_pos: pd.DataFrame | None = None) -> str:
+    def rowline(r):
+        news_short = (str(r.get("news") or "").split(".")[0])[:120]
+        avail = r.get("chance_of_playing_next_round")
+        avail_txt = f"{int(avail)}%" if pd.notna(avail) else "—"
+        gw_tag = {0: " (blank GW)", 2: " (double GW)"}.get(r.get("Fixtures_next"), "")
+        return (
+            f"{r['Name']} ({r['Position']}, {r['Club']}) – "
+            f"PPG:{_fmt1(r.get('Point per game'))}, ICT:{_fmt1(r.get('ict_index'))}, "
+            f"Ease:{_fmt1(r.get('FixtureEase'))}{gw_tag}, Run:{_fmt1(r.get('RunEase'))}, Avail:{avail_txt}, Note:{news_short} 🟢 Free"
+        )
+    avail_text = "\n".join(rowline(r) for _, r in df_top.iterrows())
+    pos_text = ""
+    if df_by_pos is not None and len(df_by_pos):
+        lines = [
+            f"{pos}: " + ", ".join(f"{n} ({c}, PPG {_fmt1(p)})" for n, c, p in zip(g["Name"], g["Club"], g["Point per game"]))
+            for pos, g in df_by_pos.groupby("Position", sort=False, observed=True)
+        ]
+        pos_text = "\n\n🧩 Best free by position:\n" + "\n".join(lines)
+    return f"""🟩 My Squad:
+{my_squad_text}
+
+🟢 Top 25 (composite score):
+{avail_text}{pos_text}
+
+🎯 Rules:
+- Only suggest players not already owned
+- Blend PPG, ICT, and fixture ease (next GW and the run after it); prefer high minutes and good availability
+- Suggest 1–2 picks and who they could replace
+
+Who should I bring in this week and why?"""
+
+# --------------- Headless entry point ----------------
+def run(league_id: str, team_id: str = "", team_name_hint: str = "",
+        weights: Weights = Weights(), min_avail: str = "75%+ only", horizon: int = HORIZON,
+        k: int = TOP_K) -> dict:
+    pool = build_pool(fetch_all(league_id))
+    my_names = find_my_squad(pool.players_by_team, pool.teams_index, team_id, team_name_hint)
+    my_squad_text = build_my_squad_text_from_names(my_names, pool.df)
+    df_scored = score(features(pool.df, pool.fixtures, min_avail, horizon), weights)
+    df_top, df_by_pos = top_k(df_scored, k), top_k_by_position(df_scored)
+    return {
+        "df_pool": pool.df,
+        "df_top": df_top,
+        "df_by_pos": df_by_pos,
+        "match": pool.match,
+        "my_squad_text": my_squad_text,
+        "prompt": build_prompt(df_top, my_squad_text, df_by_pos),
+    }
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("usage: python pipeline.py LEAGUE_ID [TEAM_ID]")
+    print(run(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else "")["prompt"])
@@ -0,0 +1,98 @@
+"""Stale-while-revalidate holder for the merged player pool.
+
+A Refresher owns the last good snapshot returned by `load()` and a daemon
+thread that rebuilds it every `interval` seconds. Readers get the current
+snapshot immediately; a finished rebuild replaces it with a single reference
+swap, so a reader never sees a half-built pool. Snapshots are shared between
+sessions and must be treated as read-only (copy before mutating).
+
+An optional `seed()` supplies a stale snapshot (e.g. rebuilt from the on-disk
+snapshot store) for a cold start; it is served at once and replaced by the
+first background rebuild, which then runs without waiting a full interval.
+"""
+import logging
+import threading
+import time
+from typing import Callable, Generic, TypeVar
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class Refresher(Generic[T]):
+    def __init__(self, load: Callable[[], T], interval: float, idle_stop: float = 30 * 60, name: str = "refresher",
+                 seed: Callable[[], tuple[T, float] | None] | None = None):
+        self._load = load
+        self._seed = seed  # -> (snapshot, taken_at epoch seconds) or None
+        self._interval = interval
+        self._idle_stop = idle_stop  # park the thread when nobody has read for this long
+        self._name = name
+        self._snapshot: T | None = None
+        self.loaded_at: float | None = None
+        self.last_error: Exception | None = None
+        self._last_read = time.monotonic()
+        self._stale = False  # seeded: rebuild on the thread's first pass
+        self._load_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._thread_lock = threading.Lock()
+
+    def get(self) -> T:
+        """Return the current snapshot, loading synchronously only on a cold start."""
+        self._last_read = time.monotonic()
+        if self._snapshot is None and not self._seeded():
+            self._cold_start()
+        self._ensure_thread()
+        return self._snapshot
+
+    def _cold_start(self) -> None:
+        with self._load_lock:
+            if self._snapshot is not None:  # another session built it while this one waited
+                return
+            self._snapshot, self.loaded_at, self.last_error = self._load(), time.time(), None
+
+    def refresh(self) -> T:
+        """Rebuild now, in the caller's thread, and swap the result in."""
+        with self._load_lock:
+            snapshot = self._load()
+            self._snapshot, self.loaded_at, self.last_error = snapshot, time.time(), None
+        return snapshot
+
+    def _seeded(self) -> bool:
+        if self._seed is None:
+            return False
+        with self._load_lock:
+            if self._snapshot is not None:
+                return True
+            try:
+                seeded = self._seed()
+            except Exception as e:  # an unreadable seed just means a normal cold start
+                log.warning("%s: seed failed: %s", self._name, e)
+                seeded = None
+            if seeded is None:
+                return False
+            self._snapshot, self.loaded_at = seeded
+            self._stale = True
+        return True
+
+    def _ensure_thread(self) -> None:
+        # Locked so concurrent sessions can't each start a refresh loop.
+        with self._thread_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            # A loop that parked on idle_stop left the snapshot aging; rebuild straight away.
+            if self.loaded_at is not None and time.time() - self.loaded_at > self._interval:
+                self._stale = True
+            self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while time.monotonic() - self._last_read < self._idle_stop:
+            if not self._stale:
+                time.sleep(self._interval)
+            self._stale = False
+            try:
+                self.refresh()
+            except Exception as e:  # keep serving the last good snapshot
+                self.last_error = e
+                log.warning("%s: background refresh failed: %s", self._name, e)
@@ -0,0 +1,140 @@
+"""Offline replay of the upstream endpoints.
+
+`record` saves the raw bodies of CSV_URL, LIVE_URL, FPL_BOOTSTRAP and
+FPL_FIXTURES into a directory; `serve` answers those URLs from it with a local
+HTTP server, optionally slowed down and failing on purpose. Point the app or
+pipeline at it with WAIVER_REPLAY_URL and nothing leaves the machine:
+
+    python replay.py record recordings/ LEAGUE_ID
+    python replay.py serve recordings/ --port 8765 --latency 0.3 --fail-rate 0.1
+    WAIVER_REPLAY_URL=http://127.0.0.1:8765 streamlit run app.py
+
+Responses carry an ETag (so bootstrap revalidation gets 304s), are gzipped
+when the client accepts it, and an injected failure is a 503 that the client's
+retry policy has to absorb.
+"""
+import argparse
+import gzip
+import hashlib
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import quote, urlsplit
+
+import http_client
+import pipeline
+
+
+def recording_name(url: str) -> str:
+    """File name a URL is recorded under: host, path and query, percent-encoded into one name."""
+    parts = urlsplit(url)
+    return quote(f"{parts.netloc}{parts.path}?{parts.query}", safe="")
+
+
+def upstream_urls(league_id: str) -> list[str]:
+    return [pipeline.CSV_URL, pipeline.LIVE_URL.format(league_id=league_id),
+            pipeline.FPL_BOOTSTRAP, pipeline.FPL_FIXTURES]
+
+
+def record(directory: Path, league_id: str) -> None:
+    """Fetch every upstream URL once and store the (decoded) bodies in `directory`."""
+    directory.mkdir(parents=True, exist_ok=True)
+    for url in upstream_urls(league_id):
+        body = http_client.get(url).content
+        (directory / recording_name(url)).write_bytes(body)
+        print(f"{url} -> {len(body):,} bytes")
+
+
+class ReplayServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, directory: Path, latency: float = 0.0, fail_rate: float = 0.0, seed: int | None = None):
+        super().__init__(address, ReplayHandler)
+        self.directory = directory
+        self.latency = latency      # seconds added to every response
+        self.fail_rate = fail_rate  # share of requests answered with a 503
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def should_fail(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            fail = self.random.random() < self.fail_rate
+            self.failures += fail
+            return fail
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    server: ReplayServer
+
+    def do_GET(self) -> None:
+        time.sleep(self.server.latency)
+        if self.server.should_fail():
+            self.send_error(503, "injected failure")
+            return
+        # Requests arrive as /<host><path>?<query>, see http_client.REPLAY_URL.
+        path = self.server.directory / recording_name(f"//{self.path.lstrip('/')}")
+        if not path.is_file():
+            self.send_error(404, f"no recording for {self.path}")
+            return
+        body = path.read_bytes()
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body, compresslevel=1)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        pass  # keep load tests quiet
+
+
+def serve(directory: Path, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+          fail_rate: float = 0.0, seed: int | None = None) -> ReplayServer:
+    """Start a ReplayServer on a daemon thread (port 0 picks a free one); call .shutdown() to stop."""
+    server = ReplayServer((host, port), directory, latency, fail_rate, seed)
+    threading.Thread(target=server.serve_forever, name="replay", daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record", help="save the live upstream bodies")
+    rec.add_argument("directory", type=Path)
+    rec.add_argument("league_id")
+    srv = sub.add_parser("serve", help="answer upstream URLs from a recording")
+    srv.add_argument("directory", type=Path)
+    srv.add_argument("--host", default="127.0.0.1")
+    srv.add_argument("--port", type=int, default=8765)
+    srv.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    srv.add_argument("--fail-rate", type=float, default=0.0, help="share of requests answered with a 503")
+    srv.add_argument("--seed", type=int, default=None, help="make injected failures reproducible")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        record(args.directory, args.league_id)
+    else:
+        server = ReplayServer((args.host, args.port), args.directory, args.latency, args.fail_rate, args.seed)
+        print(f"replaying {args.directory} on {server.url} (WAIVER_REPLAY_URL={server.url})")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,79 @@
+"""Timestamped columnar snapshots of every raw fetch.
+
+Each fetcher saves what it got from upstream (players CSV, league roster,
+bootstrap elements/teams, fixtures) as an uncompressed Arrow IPC file under the
+cache dir; the newest few per source are kept. Reads memory-map the file, so a
+restart can rebuild the pool from the last snapshot in milliseconds and keep
+serving it while the upstream endpoints are down. Without pyarrow the store is
+a no-op.
+"""
+import logging
+import re
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from storage import CACHE_ROOT, write_atomic
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - pyarrow ships with streamlit
+    pa = None
+
+log = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = CACHE_ROOT / "snapshots"
+KEEP = 3  # snapshots kept per source
+
+
+class SnapshotStore:
+    def __init__(self, root: Path, keep: int = KEEP):
+        self.root = root
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._last: dict[str, pd.DataFrame] = {}  # name -> frame saved last
+
+    @staticmethod
+    def _slug(name: str) -> str:
+        return re.sub(r"[^\w.-]", "_", name)
+
+    def _paths(self, name: str) -> list[Path]:
+        # Timestamps are fixed-width, so lexical order is chronological; newest last.
+        return sorted(self.root.glob(f"{self._slug(name)}@*.arrow"))
+
+    def save(self, name: str, df: pd.DataFrame) -> None:
+        """Write df as the newest snapshot of `name`; a frame already saved as-is is skipped."""
+        if pa is None:
+            return
+        with self._lock:
+            if self._last.get(name) is df:
+                return  # e.g. a 304 that reused the parsed frame
+            self._last[name] = df
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            sink = pa.BufferOutputStream()
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            write_atomic(self.root / f"{self._slug(name)}@{time.time():017.6f}.arrow", sink.getvalue().to_pybytes())
+            with self._lock:
+                for old in self._paths(name)[:-self.keep]:
+                    old.unlink(missing_ok=True)
+        except OSError as e:  # a full or read-only disk must not fail the fetch
+            log.warning("snapshot %s not written: %s", name, e)
+
+    def load(self, name: str) -> tuple[pd.DataFrame, float] | None:
+        """Newest snapshot of `name` and when it was taken, or None."""
+        if pa is None:
+            return None
+        paths = self._paths(name)
+        if not paths:
+            return None
+        path = paths[-1]
+        with pa.memory_map(str(path)) as source:
+            df = pa.ipc.open_file(source).read_all().to_pandas()
+        return df, float(path.stem.rpartition("@")[2])
+
+
+store = SnapshotStore(SNAPSHOT_DIR)
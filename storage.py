@@ -0,0 +1,18 @@
+"""On-disk cache location and atomic file writes, shared by every cache.
+
+Everything the app persists (HTTP bodies, name memo, crosswalk, snapshots)
+lives under CACHE_ROOT; WAIVER_CACHE_DIR moves it.
+"""
+import os
+import threading
+from pathlib import Path
+
+CACHE_ROOT = Path(os.environ.get("WAIVER_CACHE_DIR", Path(__file__).parent / ".cache"))
+
+
+def write_atomic(path: Path, data: bytes | str) -> None:
+    """Write a cache file via a per-thread temp file and os.replace, so readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(data.encode() if isinstance(data, str) else data)
+    os.replace(tmp, path)
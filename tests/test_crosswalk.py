@@ -0,0 +1,50 @@
+"""Regression check: namesakes at one club keep their own FPL ids across runs."""
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from crosswalk import Crosswalk
+
+
+def test_namesakes_at_one_club_keep_their_ids(tmp_path):
+    pool = pd.DataFrame({"Name": ["Danilo", "Danilo"], "Name_norm": ["danilo", "danilo"],
+                         "Club": ["Nott'm Forest", "Nott'm Forest"], "Position": ["DEF", "MID"]})
+    team_ids = pd.Series([17, 17])
+    fpl = pd.DataFrame({"id": [10, 11], "web_name": ["Danilo", "Danilo"], "first_name": ["Danilo", "Danilo"],
+                        "second_name": ["Oliveira", "dos Santos"], "team": [17, 17], "element_type": [2, 3]})
+
+    cw = Crosswalk(tmp_path / "crosswalk.csv")
+    assert cw.resolve(pool, team_ids, fpl).fpl_id.tolist() == [10, 11]
+    assert cw.resolve(pool, team_ids, fpl).fpl_id.tolist() == [10, 11]
+    cw.save()
+    assert Crosswalk(cw.path).resolve(pool, team_ids, fpl).fpl_id.tolist() == [10, 11]
+
+
+def test_same_key_namesakes_are_rematched(tmp_path):
+    pool = pd.DataFrame({"Name": ["Danilo", "Danilo"], "Name_norm": ["danilo", "danilo"],
+                         "Club": ["Nott'm Forest", "Nott'm Forest"], "Position": ["DEF", "DEF"]})
+    team_ids = pd.Series([17, 17])
+    fpl = pd.DataFrame({"id": [10, 11], "web_name": ["Danilo", "Danilo"], "first_name": ["Danilo", "Danilo"],
+                        "second_name": ["Oliveira", "dos Santos"], "team": [17, 17], "element_type": [2, 2]})
+
+    cw = Crosswalk(tmp_path / "crosswalk.csv")
+    for _ in range(2):
+        assert sorted(cw.resolve(pool, team_ids, fpl).fpl_id.tolist()) == [10, 11]
+    cw.save()
+    assert not cw.path.exists()  # nothing unambiguous to store
+
+
+def test_blanked_fpl_id_is_rematched(tmp_path):
+    pool = pd.DataFrame({"Name": ["Saka"], "Name_norm": ["saka"], "Club": ["Arsenal"], "Position": ["MID"]})
+    fpl = pd.DataFrame({"id": [7], "web_name": ["Saka"], "first_name": ["Bukayo"], "second_name": ["Saka"],
+                        "team": [1], "element_type": [3]})
+    path = tmp_path / "crosswalk.csv"
+    path.write_text("Name,Club,Position,fpl_id,score\nSaka,Arsenal,MID,,\n")
+
+    cw = Crosswalk(path)
+    assert cw.resolve(pool, pd.Series([1]), fpl).fpl_id.tolist() == [7]
+    cw.save()
+    assert "Saka,Arsenal,MID,7," in path.read_text()
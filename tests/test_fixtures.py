@@ -0,0 +1,38 @@
+"""Fixture matrix: double and blank gameweeks, next-gameweek lookup and decayed run ease."""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fixtures import build_fixture_matrix, next_gameweek, run_ease
+
+# GW10: team 1 plays twice (double), team 3 blanks; GW11: 1 v 3. GW12 has no games at all.
+FIXTURES = [
+    {"event": 10, "team_h": 1, "team_a": 2, "team_h_difficulty": 2, "team_a_difficulty": 4},
+    {"event": 10, "team_h": 2, "team_a": 1, "team_h_difficulty": 3, "team_a_difficulty": 5},
+    {"event": 11, "team_h": 1, "team_a": 3, "team_h_difficulty": 3, "team_a_difficulty": 3},
+    {"event": 13, "team_h": 3, "team_a": 2, "team_h_difficulty": 4, "team_a_difficulty": 2},
+    {"event": None, "team_h": 1, "team_a": 3, "team_h_difficulty": 2, "team_a_difficulty": 2},  # unscheduled
+]
+
+
+def test_matrix_counts_doubles_and_blanks():
+    m = build_fixture_matrix(FIXTURES, horizon=4)
+    assert m.team_ids.tolist() == [1, 2, 3]
+    assert m.events.tolist() == [10, 11, 12, 13]
+    assert m.count.tolist() == [[2, 1, 0, 0], [2, 0, 0, 1], [0, 1, 0, 1]]
+    assert m.ease[0, 0] == (6 - 2) + (6 - 5)
+    assert m.difficulty[0, 0] == pytest.approx(3.5)
+    assert np.isnan(m.difficulty[2, 0])
+
+
+def test_next_gameweek_and_run_ease():
+    m = build_fixture_matrix(FIXTURES, horizon=4)
+    nxt = next_gameweek(m)
+    assert nxt.loc[1].tolist() == [2, 5.0, 3.5]
+    assert nxt.loc[3, "fixtures"] == 0 and nxt.loc[3, "ease"] == 0.0
+    run = run_ease(m, horizon=2, decay=0.5)
+    assert run.loc[1] == pytest.approx((5.0 + 0.5 * 3.0) / 1.5)
@@ -0,0 +1,65 @@
+"""Fuzzy matcher: abbreviated FPL web names and namesakes at other clubs."""
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from matching import ALIAS_OTHER_CLUB, match_players
+from names import normalize_names
+
+
+def fpl_frame(rows):
+    return pd.DataFrame(rows, columns=["id", "web_name", "first_name", "second_name", "team", "element_type"])
+
+
+def pool_frame(rows):
+    df = pd.DataFrame(rows, columns=["Name", "Club", "Position"])
+    return df.assign(Name_norm=normalize_names(df["Name"]))
+
+
+def test_initial_style_web_names_match():
+    fpl = fpl_frame([
+        (1, "B.Fernandes", "Bruno Miguel", "Borges Fernandes", 14, 3),
+        (2, "G.Jesus", "Gabriel Fernando", "de Jesus", 14, 3),
+        (3, "Diogo J.", "Diogo", "Teixeira da Silva", 14, 3),
+    ])
+    pool = pool_frame([("Bruno Fernandes", "Man Utd", "MID"), ("Gabriel Jesus", "Man Utd", "MID"),
+                       ("Diogo Jota", "Man Utd", "MID")])
+    m = match_players(pool, pd.Series([14, 14, 14], dtype="Int16"), fpl)
+    assert m.fpl_id.tolist() == [1, 2, 3]
+
+
+def test_initials_need_a_matching_surname():
+    fpl = fpl_frame([(1, "B.Fernandes", "Bruno Miguel", "Borges Fernandes", 14, 3)])
+    pool = pool_frame([("Bruno Guimaraes", "Man Utd", "MID")])
+    m = match_players(pool, pd.Series([14], dtype="Int16"), fpl)
+    assert m.fpl_id.isna().all()
+
+
+def test_exact_name_prefers_the_players_club():
+    # West Ham lists Emerson as a DEF; FPL has him as a MID, and another Emerson plays for team 18.
+    fpl = fpl_frame([(18, "Emerson", "Emerson", "Royal", 18, 2), (19, "Emerson", "Emerson", "Palmieri", 19, 3)])
+    pool = pool_frame([("Emerson", "West Ham", "DEF")])
+    m = match_players(pool, pd.Series([19], dtype="Int16"), fpl)
+    assert m.fpl_id.tolist() == [19]
+    assert m.score.tolist() == [1.0]
+
+
+def test_exact_name_at_another_club_is_a_fallback():
+    fpl = fpl_frame([(18, "Emerson", "Emerson", "Royal", 18, 2), (20, "Emersonn", "Emersonn", "Silva", 19, 2)])
+    pool = pool_frame([("Emerson", "West Ham", "DEF")])
+    m = match_players(pool, pd.Series([19], dtype="Int16"), fpl)
+    assert m.fpl_id.tolist() == [20]  # the same-club fuzzy hit wins
+
+    m = match_players(pool, pd.Series([19], dtype="Int16"), fpl.iloc[:1])
+    assert m.fpl_id.tolist() == [18]
+    assert m.score.tolist() == [ALIAS_OTHER_CLUB]
+
+
+def test_unknown_club_takes_exact_hits():
+    fpl = fpl_frame([(7, "Saka", "Bukayo", "Saka", 1, 3)])
+    pool = pool_frame([("Saka", "Somewhere FC", "MID")])
+    m = match_players(pool, pd.Series([pd.NA], dtype="Int16"), fpl)
+    assert m.fpl_id.tolist() == [7]
@@ -0,0 +1,44 @@
+"""Refresher: one build per cold start, seeded snapshots served at once."""
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from refresher import Refresher
+
+
+def test_concurrent_cold_start_builds_once():
+    calls = []
+
+    def load():
+        calls.append(1)
+        time.sleep(0.05)
+        return len(calls)
+
+    r = Refresher(load, interval=3600, name="test-cold")
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(r.get())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == [1] * 8
+    assert len(calls) == 1
+
+
+def test_seed_is_served_then_rebuilt_in_background():
+    release = threading.Event()
+
+    def load():
+        release.wait(2)
+        return "fresh"
+
+    r = Refresher(load, interval=3600, name="test-seed", seed=lambda: ("stale", time.time() - 10))
+    assert r.get() == "stale"
+    release.set()
+    deadline = time.monotonic() + 2
+    while r.get() != "fresh" and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert r.get() == "fresh"
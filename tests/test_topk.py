@@ -0,0 +1,38 @@
+"""Top-k selection: stable ties, per-position leaderboards and the categorical Position column."""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pipeline
+
+
+def test_topk_indices_breaks_ties_by_row():
+    scores = np.array([1.0, 3.0, 2.0, 3.0, 2.0])
+    assert pipeline.topk_indices(scores, 3).tolist() == [1, 3, 2]
+    assert pipeline.topk_indices(scores, 10).tolist() == [1, 3, 2, 4, 0]
+    assert pipeline.topk_indices(scores, 0).tolist() == []
+
+
+def test_top_k_by_position_orders_groups_and_caps_each():
+    df = pd.DataFrame({
+        "Name": list("abcdefg"),
+        "Position": pd.Categorical(["FWD", "DEF", "DEF", "DEF", "MID", "GK", "XX"]),
+        "Score": [5.0, 1.0, 3.0, np.nan, 2.0, 4.0, 9.0],
+    })
+    out = pipeline.top_k_by_position(df, k=2)
+    assert out["Name"].tolist() == ["f", "c", "b", "e", "a"]  # unknown positions are dropped
+
+
+def test_prompt_skips_positions_with_no_players():
+    # Position is categorical; a position with no free players must not leave an empty line.
+    df = pd.DataFrame({
+        "Name": ["a", "b"], "Club": ["Arsenal", "Chelsea"], "Point per game": [5.0, 4.0],
+        "Position": pd.Categorical(["MID", "FWD"], categories=pipeline.POSITIONS),
+    })
+    prompt = pipeline.build_prompt(df.iloc[:0], "", df)
+    assert "MID: a (Arsenal, PPG 5.0)" in prompt
+    assert "GK:" not in prompt and "DEF:" not in prompt
@@ -0,0 +1,113 @@
+"""Lightweight spans for timing pipeline stages.
+
+`with span("name", key=value) as s:` times a block, nests under the enclosing
+span (tracked with contextvars, so pass contextvars.copy_context() along to
+worker threads) and logs one JSON line to the "tracing" logger at INFO.
+`@traced("name")` does the same for a whole function. Inside
+`with collect() as trace:` every finished span is also appended to
+trace.spans, which is what the app's Diagnostics expander renders.
+"""
+import functools
+import itertools
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+log = logging.getLogger(__name__)
+
+_ids = itertools.count(1)
+
+
+class Span:
+    __slots__ = ("name", "id", "parent", "started_at", "ms", "attrs")
+
+    def __init__(self, name: str, parent: int | None, attrs: dict):
+        self.name = name
+        self.id = next(_ids)
+        self.parent = parent
+        self.started_at = time.time()
+        self.ms: float | None = None
+        self.attrs = attrs
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+    def record(self) -> dict:
+        return {"span": self.name, "id": self.id, "parent": self.parent,
+                "started_at": round(self.started_at, 3), "ms": round(self.ms or 0.0, 3), **self.attrs}
+
+
+class Trace:
+    """Finished spans, in completion order (children before their parent)."""
+
+    def __init__(self):
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, s: Span) -> None:
+        with self._lock:
+            self.spans.append(s)
+
+    def records(self) -> list[dict]:
+        return records(self.spans)
+
+
+def records(spans) -> list[dict]:
+    """Span records in start order, with `depth` for indenting children."""
+    depth = {}
+    out = []
+    for s in sorted(spans, key=lambda s: s.id):  # ids are handed out at start
+        depth[s.id] = depth.get(s.parent, -1) + 1
+        out.append({**s.record(), "depth": depth[s.id]})
+    return out
+
+
+_span: ContextVar[Span | None] = ContextVar("span", default=None)
+_trace: ContextVar[Trace | None] = ContextVar("trace", default=None)
+
+
+@contextmanager
+def span(name: str, **attrs) -> Iterator[Span]:
+    parent = _span.get()
+    s = Span(name, parent.id if parent else None, attrs)
+    token = _span.set(s)
+    start = time.perf_counter()
+    try:
+        yield s
+    except BaseException as e:
+        s.set(error=f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        s.ms = (time.perf_counter() - start) * 1e3
+        _span.reset(token)
+        trace = _trace.get()
+        if trace is not None:
+            trace.add(s)
+        if log.isEnabledFor(logging.INFO):
+            log.info(json.dumps(s.record(), default=str))
+
+
+def traced(name: str):
+    """Decorator: run the function inside span(name)."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+@contextmanager
+def collect() -> Iterator[Trace]:
+    """Collect every span finished in this context (and contexts copied from it) into a Trace."""
+    trace = Trace()
+    token = _trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _trace.reset(token)